@@ -5,18 +5,24 @@ Main Streamlit Application
 
 import streamlit as st
 import pandas as pd
-import json
+import hashlib
 import os
-import time
+import queue
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
 from pathlib import Path
+from typing import Any, Callable, Dict, Optional
 
 # Import custom modules
 from src.data_processing.preprocessing import (
     create_enriched_tracking_data,
-    get_enriched_data_info
+    get_enriched_data_info,
+    load_csv_data
 )
 from src.analytics.framework import MetricsEngine
 from src.ui.report_page import render_match_report, render_export_options
+from src.ui.styles import APP_CSS
 
 # Configure Streamlit page
 st.set_page_config(
@@ -26,67 +32,67 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-# SkillCorner Color scheme
-from src.analytics.colors import SKILLCORNER_COLORS
+# Custom CSS
+st.markdown(APP_CSS, unsafe_allow_html=True)
 
-COLORS = SKILLCORNER_COLORS
+# Uploads are streamed to disk in chunks of this size
+UPLOAD_CHUNK_SIZE = 8 * 1024 * 1024
+
+# Read size used when hashing files for cache keys
+HASH_CHUNK_SIZE = 1024 * 1024
+
+# Enriched tracking data cached per match, keyed on file contents
+ENRICHED_CACHE_DIR = Path("data/processed")
+
+# Seconds between progress polls while metrics compute in the background
+PROGRESS_POLL_INTERVAL = 0.5
+
+
+@st.cache_resource
+def get_metrics_engine() -> MetricsEngine:
+    """
+    Shared metrics engine, created once per server process
+
+    Sessions share its section table and its worker pool, which starts on
+    the first computation and is reused after that. Per-run data is passed
+    to compute_all_metrics, so one engine can serve every session.
+    """
+    return MetricsEngine()
+
+
+@st.cache_resource
+def get_background_executor() -> ThreadPoolExecutor:
+    """Shared executor that runs metrics computation off the script thread"""
+    return ThreadPoolExecutor(max_workers=2)
+
+
+@dataclass
+class AppState:
+    """Per-session application state"""
+    enriched_data: Any = None
+    uploaded_files: Dict[str, str] = field(default_factory=dict)
+    processing_complete: bool = False
+    metrics_results: Any = None
+    events_df: Any = None
+    phases_df: Any = None
+    # Background metrics computation: its future, the queue its progress
+    # callback pushes (current, total, message) onto and the latest update
+    metrics_future: Any = None
+    metrics_progress: Any = None
+    metrics_status: tuple = (0, 1, "Computing tactical metrics...")
 
-# Custom CSS
-st.markdown(f"""
-<style>
-    .main {{
-        background-color: {COLORS['background']};
-        color: {COLORS['text']};
-    }}
-    .stButton>button {{
-        background-color: {COLORS['primary']};
-        color: white;
-        border-radius: 5px;
-        padding: 0.5rem 1rem;
-        font-weight: 600;
-    }}
-    .stButton>button:hover {{
-        background-color: {COLORS['accent']};
-    }}
-    .success-box {{
-        background-color: {COLORS['success']};
-        color: white;
-        padding: 1rem;
-        border-radius: 5px;
-        margin: 1rem 0;
-    }}
-    .info-box {{
-        background-color: {COLORS['secondary']};
-        color: white;
-        padding: 1rem;
-        border-radius: 5px;
-        margin: 1rem 0;
-    }}
-    h1, h2, h3 {{
-        color: {COLORS['text']};
-    }}
-</style>
-""", unsafe_allow_html=True)
 
 # Initialize session state
-if 'enriched_data' not in st.session_state:
-    st.session_state.enriched_data = None
-if 'uploaded_files' not in st.session_state:
-    st.session_state.uploaded_files = {}
-if 'processing_complete' not in st.session_state:
-    st.session_state.processing_complete = False
-if 'metrics_results' not in st.session_state:
-    st.session_state.metrics_results = None
-if 'events_df' not in st.session_state:
-    st.session_state.events_df = None
-if 'phases_df' not in st.session_state:
-    st.session_state.phases_df = None
+st.session_state.setdefault("app", AppState())
 
 
 def save_uploaded_file(uploaded_file, directory: str) -> str:
     """
     Save uploaded file to specified directory
 
+    The file is streamed in fixed-size chunks so large tracking files
+    are never held in memory twice.
+
     Args:
         uploaded_file: Streamlit uploaded file object
         directory: Directory to save the file
@@ -96,11 +102,86 @@ def save_uploaded_file(uploaded_file, directory: str) -> str:
     """
     os.makedirs(directory, exist_ok=True)
     file_path = os.path.join(directory, uploaded_file.name)
+    uploaded_file.seek(0)
     with open(file_path, "wb") as f:
-        f.write(uploaded_file.getbuffer())
+        shutil.copyfileobj(uploaded_file, f, length=UPLOAD_CHUNK_SIZE)
     return file_path
 
 
+def file_sha256(file_path: str) -> str:
+    """
+    Compute the SHA-256 digest of a file on disk
+
+    Reads into one reusable 1 MiB buffer so large tracking files are
+    hashed without allocating a new bytes object per chunk.
+
+    Args:
+        file_path: Path to the file
+
+    Returns:
+        Hex digest of the file contents
+    """
+    digest = hashlib.sha256()
+    buffer = memoryview(bytearray(HASH_CHUNK_SIZE))
+    with open(file_path, "rb", buffering=0) as f:
+        while n := f.readinto(buffer):
+            digest.update(buffer[:n])
+    return digest.hexdigest()
+
+
+def load_enriched_tracking_data(
+    tracking_path: str,
+    metadata_path: str,
+    match_id: str,
+    progress_callback: Optional[Callable[[int, int, str], None]] = None
+) -> pd.DataFrame:
+    """
+    Enriched tracking data, cached on disk by file contents
+
+    The cache file is keyed on the content hashes of the tracking and
+    metadata files (plus the match id), so re-processing the same match
+    reads it back instead of re-parsing the files. On a miss the data is
+    built with create_enriched_tracking_data, which reports its progress.
+
+    This is a plain pickle cache rather than st.cache_data: Streamlit
+    replays element calls made inside a cached function on a cache hit,
+    so a cached function could not update the caller's progress bar.
+
+    Args:
+        tracking_path: Path to tracking JSONL file
+        metadata_path: Path to metadata JSON file
+        match_id: Match identifier
+        progress_callback: Progress callback (current, total, message),
+            only called on a cache miss
+
+    Returns:
+        Enriched tracking dataframe
+    """
+    cache_key = hashlib.sha256(
+        f"{file_sha256(tracking_path)}_{file_sha256(metadata_path)}_{match_id}".encode()
+    ).hexdigest()
+    cache_file = ENRICHED_CACHE_DIR / f"{cache_key}.pkl"
+
+    if cache_file.exists():
+        try:
+            return pd.read_pickle(cache_file)
+        except Exception:
+            # Unreadable (e.g. truncated) cache file: rebuild it below
+            pass
+
+    enriched_df = create_enriched_tracking_data(
+        tracking_path, metadata_path, match_id, progress_callback=progress_callback
+    )
+
+    # Write to a temporary name first so a failed write leaves no partial file
+    ENRICHED_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    temp_file = cache_file.with_suffix(".tmp")
+    enriched_df.to_pickle(temp_file)
+    os.replace(temp_file, cache_file)
+
+    return enriched_df
+
+
 def process_data(metadata_path, tracking_path, events_path, phases_path, match_id):
     """
     Process uploaded data and create enriched tracking data
@@ -117,42 +198,49 @@ def process_data(metadata_path, tracking_path, events_path, phases_path, match_i
 
     try:
         # Stage 1: Load data
-        status_text.text("⚙️ Loading metadata...")
-        progress_bar.progress(10)
+        status_text.text("⚙️ Loading tracking data...")
+
+        # Progress callback for tracking enrichment
+        def tracking_progress(current, total, message):
+            percent = int((current / total) * 25)  # 0-25%
+            progress_bar.progress(percent)
+            status_text.text(f"⚙️ {message}")
 
-        # Create enriched tracking data
-        enriched_df = create_enriched_tracking_data(
+        # Create enriched tracking data (cached on file contents)
+        enriched_df = load_enriched_tracking_data(
             tracking_path,
             metadata_path,
-            match_id
+            match_id,
+            progress_callback=tracking_progress
         )
-        st.session_state.enriched_data = enriched_df
+        st.session_state.app.enriched_data = enriched_df
 
         status_text.text("⚙️ Loading events and phases data...")
         progress_bar.progress(25)
 
         # Load events and phases
-        events_df = pd.read_csv(events_path)
-        phases_df = pd.read_csv(phases_path)
+        events_df = load_csv_data(events_path)
+        phases_df = load_csv_data(phases_path)
 
-        st.session_state.events_df = events_df
-        st.session_state.phases_df = phases_df
+        st.session_state.app.events_df = events_df
+        st.session_state.app.phases_df = phases_df
 
-        # Stage 2: Compute metrics
-        status_text.text("⚙️ Computing tactical metrics...")
-        progress_bar.progress(40)
+        # Stage 2: Compute metrics in the background with the shared engine;
+        # render_metrics_progress polls the future and draws the progress
+        metrics_engine = get_metrics_engine()
 
-        # Initialize metrics engine
-        metrics_engine = MetricsEngine()
+        # The callback runs on the executor thread, which cannot touch
+        # Streamlit elements, so progress is queued for the script thread
+        progress_queue = queue.Queue()
 
-        # Progress callback for metrics computation
         def metrics_progress(current, total, message):
-            percent = 40 + int((current / total) * 50)  # 40-90%
-            progress_bar.progress(percent)
-            status_text.text(f"⚙️ {message} ({current}/{total})")
+            progress_queue.put((current, total, message))
 
-        # Compute all metrics with progress tracking
-        metrics_results = metrics_engine.compute_all_metrics(
+        st.session_state.app.processing_complete = False
+        st.session_state.app.metrics_progress = progress_queue
+        st.session_state.app.metrics_status = (0, 1, "Computing tactical metrics...")
+        st.session_state.app.metrics_future = get_background_executor().submit(
+            metrics_engine.compute_all_metrics,
             events_df,
             phases_df,
             team_id=match_id,
@@ -160,11 +248,8 @@ def process_data(metadata_path, tracking_path, events_path, phases_path, match_i
             progress_callback=metrics_progress
         )
 
-        st.session_state.metrics_results = metrics_results
-
-        progress_bar.progress(100)
-        status_text.text("✅ Analysis complete!")
-        st.session_state.processing_complete = True
+        progress_bar.empty()
+        status_text.empty()
 
     except Exception as e:
         st.error(f"❌ Error during processing: {str(e)}")
@@ -174,6 +259,59 @@ def process_data(metadata_path, tracking_path, events_path, phases_path, match_i
         status_text.empty()
 
 
+@st.fragment(run_every=PROGRESS_POLL_INTERVAL)
+def render_metrics_progress():
+    """
+    Progress of the background metrics computation
+
+    Reruns on its own every PROGRESS_POLL_INTERVAL seconds, so the rest of
+    the page stays responsive, and reruns the whole app once the
+    computation has finished.
+    """
+    app = st.session_state.app
+    if app.metrics_future is None:
+        return
+
+    # Keep only the latest update queued since the last poll
+    while True:
+        try:
+            app.metrics_status = app.metrics_progress.get_nowait()
+        except queue.Empty:
+            break
+
+    current, total, message = app.metrics_status
+    percent = 40 + int((current / total) * 50)  # 40-90%
+    st.progress(percent)
+    st.text(f"⚙️ {message} ({current}/{total})" if current else f"⚙️ {message}")
+
+    if app.metrics_future.done():
+        st.rerun()
+
+
+def finish_metrics():
+    """
+    Store the result of a finished background metrics computation
+
+    Returns:
+        True if the metrics were computed successfully
+    """
+    app = st.session_state.app
+    future = app.metrics_future
+    app.metrics_future = None
+    app.metrics_progress = None
+
+    try:
+        app.metrics_results = future.result()
+    except Exception as e:
+        st.error(f"❌ Error during processing: {str(e)}")
+        import traceback
+        st.error(traceback.format_exc())
+        return False
+
+    app.processing_complete = True
+    return True
+
+
 def main():
     """Main application"""
 
@@ -253,36 +391,36 @@ def main():
         if all_files_uploaded:
             st.success("✅ All files uploaded successfully!")
 
-            # Process button
-            if st.button("🔍 Process Data", type="primary"):
+            # Process button (disabled while metrics compute in the background)
+            metrics_running = st.session_state.app.metrics_future is not None
+            if st.button("🔍 Process Data", type="primary", disabled=metrics_running):
                 with st.spinner("Processing data..."):
-                    # Save uploaded files
-                    metadata_path = save_uploaded_file(metadata_file, "data/uploads")
-                    tracking_path = save_uploaded_file(tracking_file, "data/uploads")
-                    events_path = save_uploaded_file(events_file, "data/uploads")
-                    phases_path = save_uploaded_file(phases_file, "data/uploads")
+                    # Save uploaded files concurrently (each upload has its
+                    # own file pointer, so the writes are independent)
+                    uploads = {
+                        'metadata': metadata_file,
+                        'tracking': tracking_file,
+                        'events': events_file,
+                        'phases': phases_file
+                    }
+                    with ThreadPoolExecutor(max_workers=len(uploads)) as executor:
+                        futures = {
+                            key: executor.submit(save_uploaded_file, uploaded, "data/uploads")
+                            for key, uploaded in uploads.items()
+                        }
+                        paths = {key: future.result() for key, future in futures.items()}
 
                     # Store paths in session state
-                    st.session_state.uploaded_files = {
-                        'metadata': metadata_path,
-                        'tracking': tracking_path,
-                        'events': events_path,
-                        'phases': phases_path
-                    }
+                    st.session_state.app.uploaded_files = paths
 
                     # Process data
                     process_data(
-                        metadata_path,
-                        tracking_path,
-                        events_path,
-                        phases_path,
+                        paths['metadata'],
+                        paths['tracking'],
+                        paths['events'],
+                        paths['phases'],
                         match_id
                     )
-
-                    if st.session_state.processing_complete:
-                        st.balloons()
-                        st.success("🎉 Data processing completed successfully!")
-                        st.info("👈 Navigate to 'Match Analysis Report' in the sidebar to view comprehensive analysis")
         else:
             st.warning("⚠️ Please upload all four required files to continue")
 
@@ -300,21 +438,44 @@ def main():
             if missing:
                 st.error(f"Missing files: {', '.join(missing)}")
 
+        # Background metrics computation: poll it until it finishes, then
+        # store the results on the full rerun that follows
+        metrics_future = st.session_state.app.metrics_future
+        if metrics_future is not None:
+            if not metrics_future.done():
+                render_metrics_progress()
+            elif finish_metrics():
+                st.progress(100)
+                st.text("✅ Analysis complete!")
+                st.balloons()
+                st.success("🎉 Data processing completed successfully!")
+                st.info("👈 Navigate to 'Match Analysis Report' in the sidebar to view comprehensive analysis")
+
     # Page: Match Analysis Report
     elif page == "Match Analysis Report":
-        if st.session_state.metrics_results is None:
+        # A computation started on the upload page may still be running
+        metrics_future = st.session_state.app.metrics_future
+        if metrics_future is not None:
+            if not metrics_future.done():
+                render_metrics_progress()
+            else:
+                finish_metrics()
+
+        if st.session_state.app.metrics_future is not None and st.session_state.app.metrics_results is None:
+            st.info("⏳ Tactical metrics are still being computed...")
+        elif st.session_state.app.metrics_results is None:
             st.warning("⚠️ No analysis available. Please upload and process data first.")
             st.info("👈 Go to 'Upload Data' page to get started")
         else:
             # Render the match report
             render_match_report(
-                st.session_state.metrics_results,
-                st.session_state.events_df,
-                st.session_state.phases_df
+                st.session_state.app.metrics_results,
+                st.session_state.app.events_df,
+                st.session_state.app.phases_df
             )
 
             # Export options
-            render_export_options(st.session_state.metrics_results)
+            render_export_options(st.session_state.app.metrics_results)
 
 
 if __name__ == "__main__":
@@ -6,11 +6,18 @@ Orchestrates parallel computation of all metrics with progress tracking
 import pandas as pd
 import numpy as np
 from typing import Dict, Any, List, Callable
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+import os
 import time
+import logging
+import multiprocessing
+import threading
+import tempfile
 from pathlib import Path
-import pickle
+import json
 import hashlib
+import pyarrow as pa
 
 # Import all metric modules
 from .metrics import (
@@ -27,9 +34,165 @@ from .metrics import (
     analyze_momentum,
     analyze_consistency,
     analyze_training_focus,
-    analyze_opponent_exploitation
+    analyze_opponent_exploitation,
+    prepare_events
 )
 
+logger = logging.getLogger(__name__)
+
+
+def _compute_section(section: Dict[str, Any], events_df: pd.DataFrame, phases_df: pd.DataFrame = None) -> Dict[str, Any]:
+    """
+    Compute metrics for a single section
+
+    Defined at module level so it can run in worker processes; the section
+    dict pickles cleanly since its analyzer is a module-level function.
+    """
+    try:
+        start_time = time.time()
+
+        # Execute the metric function
+        result = section['function'](events_df, phases_df)
+
+        # Add metadata
+        result['id'] = section['id']
+        result['name'] = section['name']
+        result['icon'] = section['icon']
+        result['computation_time'] = time.time() - start_time
+        result['status'] = 'success'
+
+        return result
+
+    except Exception as e:
+        return {
+            'id': section['id'],
+            'name': section['name'],
+            'icon': section['icon'],
+            'section': section['name'],
+            'status': 'error',
+            'error': str(e),
+            'metrics': {}
+        }
+
+
+def _json_default(value):
+    """
+    Convert numpy values that the json module cannot encode natively
+    """
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _frame_digest(df: pd.DataFrame) -> str:
+    """
+    Content hash of a dataframe's column names and row values
+    """
+    if df is None:
+        return "none"
+
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(repr(df.columns.tolist()).encode())
+    digest.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def _str_keys(value):
+    """
+    Copy nested dicts with every key converted to str
+
+    JSON object keys are always strings, so fresh results are normalized
+    the same way for them to match results loaded from the cache.
+    """
+    if isinstance(value, dict):
+        return {str(k): _str_keys(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_str_keys(v) for v in value]
+    return value
+
+
+def _worker_context():
+    """
+    Multiprocessing context for the section worker pool
+
+    The engine runs inside the multi-threaded Streamlit server, and forking
+    a multi-threaded process is unsafe, so workers are started from a fork
+    server where available and spawned otherwise.
+    """
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("forkserver")
+    return multiprocessing.get_context("spawn")
+
+
+# Dataframes shared with a worker process, loaded once per computation by
+# _load_worker_frames and kept until the next one
+_worker_sources = None
+_worker_events_df = None
+_worker_phases_df = None
+
+
+def _share_frame(df: pd.DataFrame, directory: str, name: str):
+    """
+    Write a dataframe to an Arrow IPC file for worker processes
+
+    Returns the file path, or the dataframe itself if it cannot be
+    represented in Arrow (it is then pickled once per worker instead).
+    """
+    if df is None:
+        return None
+
+    try:
+        table = pa.Table.from_pandas(df, preserve_index=False)
+    except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError):
+        return df
+
+    path = os.path.join(directory, f"{name}.arrow")
+    with pa.OSFile(path, "wb") as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    return path
+
+
+def _load_shared_frame(source):
+    """
+    Load a dataframe shared by _share_frame
+
+    The file is read into memory rather than memory-mapped, since workers
+    outlive the temporary directory the file is written to.
+    """
+    if not isinstance(source, str):
+        return source
+
+    with pa.OSFile(source, "rb") as f:
+        return pa.ipc.open_file(f).read_all().to_pandas()
+
+
+def _load_worker_frames(events_source, phases_source):
+    """
+    Load the shared events and phases once per computation in a worker
+    """
+    global _worker_sources, _worker_events_df, _worker_phases_df
+
+    # Shared file paths are unique per computation; dataframes that could
+    # not be shared as files arrive with each task and are used directly
+    sources = (events_source, phases_source)
+    if all(isinstance(source, str) or source is None for source in sources) and sources == _worker_sources:
+        return
+
+    _worker_events_df = _load_shared_frame(events_source)
+    _worker_phases_df = _load_shared_frame(phases_source)
+    _worker_sources = sources
+
+
+def _compute_section_worker(section: Dict[str, Any], events_source, phases_source) -> Dict[str, Any]:
+    """
+    Compute a section in a worker process against the shared dataframes
+    """
+    _load_worker_frames(events_source, phases_source)
+    return _compute_section(section, _worker_events_df, _worker_phases_df)
+
 
 class MetricsEngine:
     """
@@ -46,6 +209,10 @@ class MetricsEngine:
         self.cache_dir = Path(cache_dir)
         self.cache_dir.mkdir(parents=True, exist_ok=True)
 
+        # Worker pool, started on first use and reused by later computations
+        self._executor = None
+        self._executor_lock = threading.Lock()
+
         # Define all 14 sections with their compute functions
         self.sections = [
             {
@@ -148,82 +315,105 @@ class MetricsEngine:
             }
         ]
 
+        # Section metadata without the compute functions, built once
+        self._section_list = [
+            {
+                'id': s['id'],
+                'name': s['name'],
+                'icon': s['icon']
+            }
+            for s in self.sections
+        ]
+
     def _generate_cache_key(self, events_df: pd.DataFrame, phases_df: pd.DataFrame = None, team_id: str = None) -> str:
         """
         Generate unique cache key based on data
+
+        Hashes the column names and row contents of each dataframe, so
+        different matches with the same shape never share a cache entry.
         """
-        # Use data shape and sample values for hashing
-        key_string = f"{len(events_df)}_{events_df.columns.tolist()}"
+        digest = hashlib.blake2b(digest_size=16)
 
-        if phases_df is not None:
-            key_string += f"_{len(phases_df)}_{phases_df.columns.tolist()}"
+        for df in (events_df, phases_df):
+            digest.update(_frame_digest(df).encode())
 
         if team_id:
-            key_string += f"_{team_id}"
+            digest.update(str(team_id).encode())
 
-        return hashlib.md5(key_string.encode()).hexdigest()
+        return digest.hexdigest()
 
     def _load_from_cache(self, cache_key: str) -> Dict[str, Any]:
         """
         Load metrics from cache if available
         """
-        cache_file = self.cache_dir / f"{cache_key}.pkl"
+        cache_file = self.cache_dir / f"{cache_key}.json"
 
         if cache_file.exists():
             try:
-                with open(cache_file, 'rb') as f:
-                    cached_data = pickle.load(f)
+                with open(cache_file, 'r') as f:
+                    cached_data = json.load(f)
 
                 # Check if cache is recent (less than 1 hour old)
                 cache_age = time.time() - cache_file.stat().st_mtime
                 if cache_age < 3600:  # 1 hour
                     return cached_data
             except Exception as e:
-                print(f"Cache load error: {e}")
+                logger.warning("Cache load error: %s", e)
 
         return None
 
     def _save_to_cache(self, cache_key: str, data: Dict[str, Any]):
         """
         Save metrics to cache
+
+        Results are nested dicts of scalars, stored as JSON (NaN is kept as
+        a JSON NaN literal, numpy scalars are converted to Python numbers).
         """
-        cache_file = self.cache_dir / f"{cache_key}.pkl"
+        cache_file = self.cache_dir / f"{cache_key}.json"
 
         try:
-            with open(cache_file, 'wb') as f:
-                pickle.dump(data, f)
+            # Encode before opening so a failed encode leaves no partial file
+            encoded = json.dumps(data, default=_json_default)
+            with open(cache_file, 'w') as f:
+                f.write(encoded)
         except Exception as e:
-            print(f"Cache save error: {e}")
+            logger.warning("Cache save error: %s", e)
 
     def compute_section(self, section: Dict[str, Any], events_df: pd.DataFrame, phases_df: pd.DataFrame = None) -> Dict[str, Any]:
         """
         Compute metrics for a single section
         """
-        try:
-            start_time = time.time()
-
-            # Execute the metric function
-            result = section['function'](events_df, phases_df)
+        return _compute_section(section, events_df, phases_df)
 
-            # Add metadata
-            result['id'] = section['id']
-            result['name'] = section['name']
-            result['icon'] = section['icon']
-            result['computation_time'] = time.time() - start_time
-            result['status'] = 'success'
-
-            return result
+    def _get_executor(self) -> ProcessPoolExecutor:
+        """
+        Worker pool shared by all computations on this engine
+        """
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=min(os.cpu_count() or 1, len(self.sections)),
+                    mp_context=_worker_context(),
+                )
+            return self._executor
+
+    def _discard_executor(self, executor: ProcessPoolExecutor):
+        """
+        Drop a broken worker pool so the next computation starts a new one
+        """
+        with self._executor_lock:
+            if self._executor is executor:
+                self._executor = None
+        executor.shutdown(wait=False)
 
-        except Exception as e:
-            return {
-                'id': section['id'],
-                'name': section['name'],
-                'icon': section['icon'],
-                'section': section['name'],
-                'status': 'error',
-                'error': str(e),
-                'metrics': {}
-            }
+    def _submit_sections(self, executor: ProcessPoolExecutor, events_source, phases_source) -> Dict[Any, Dict[str, Any]]:
+        """
+        Submit every section to the worker pool, returning future -> section
+        """
+        return {
+            executor.submit(_compute_section_worker, section, events_source, phases_source): section
+            for section in self.sections
+        }
 
     def compute_all_metrics(
         self,
@@ -256,6 +446,9 @@ class MetricsEngine:
                     progress_callback(len(self.sections), len(self.sections), "Loaded from cache")
                 return cached_results
 
+        # Precompute masks shared by several sections
+        events_df = prepare_events(events_df)
+
         # Initialize results
         results = {
             'team_id': team_id,
@@ -268,13 +461,23 @@ class MetricsEngine:
             }
         }
 
-        # Parallel computation using ThreadPoolExecutor
-        with ThreadPoolExecutor(max_workers=4) as executor:
-            # Submit all tasks
-            future_to_section = {
-                executor.submit(self.compute_section, section, events_df, phases_df): section
-                for section in self.sections
-            }
+        # Parallel computation across processes (sections are CPU-bound
+        # pandas/numpy work, so threads would serialize on the GIL). The
+        # dataframes are written once to Arrow IPC files that each worker
+        # loads on its first task, instead of being pickled into every task.
+        with tempfile.TemporaryDirectory() as shared_dir:
+            events_source = _share_frame(events_df, shared_dir, "events")
+            phases_source = _share_frame(phases_df, shared_dir, "phases")
+
+            # Submit all tasks, starting a new pool if a worker of the
+            # current one died while it was idle
+            try:
+                executor = self._get_executor()
+                future_to_section = self._submit_sections(executor, events_source, phases_source)
+            except BrokenProcessPool:
+                self._discard_executor(executor)
+                executor = self._get_executor()
+                future_to_section = self._submit_sections(executor, events_source, phases_source)
 
             # Process completed tasks
             completed = 0
@@ -296,6 +499,9 @@ class MetricsEngine:
                         )
 
                 except Exception as e:
+                    if isinstance(e, BrokenProcessPool):
+                        self._discard_executor(executor)
+
                     results['sections'][section['id']] = {
                         'id': section['id'],
                         'name': section['name'],
@@ -319,6 +525,9 @@ class MetricsEngine:
         results['summary']['successful_sections'] = sum(1 for s in results['sections'].values() if s.get('status') == 'success')
         results['summary']['failed_sections'] = sum(1 for s in results['sections'].values() if s.get('status') == 'error')
 
+        # Dict keys as str, as they come back from the JSON cache
+        results = _str_keys(results)
+
         # Save to cache
         if use_cache:
             self._save_to_cache(cache_key, results)
@@ -328,19 +537,15 @@ class MetricsEngine:
     def get_section_list(self) -> List[Dict[str, Any]]:
         """
         Get list of all sections with metadata
+
+        Returns copies, since the engine is shared across sessions and
+        callers may modify the list or its entries.
         """
-        return [
-            {
-                'id': s['id'],
-                'name': s['name'],
-                'icon': s['icon']
-            }
-            for s in self.sections
-        ]
+        return [dict(section) for section in self._section_list]
 
     def clear_cache(self):
         """
         Clear all cached metrics
         """
-        for cache_file in self.cache_dir.glob("*.pkl"):
+        for cache_file in self.cache_dir.glob("*.json"):
             cache_file.unlink()
@@ -17,6 +17,7 @@ from .momentum import analyze_momentum
 from .consistency import analyze_consistency
 from .training import analyze_training_focus
 from .opponent import analyze_opponent_exploitation
+from .prepare import prepare_events
 
 __all__ = [
     'analyze_team_identity',
@@ -33,4 +34,5 @@ __all__ = [
     'analyze_consistency',
     'analyze_training_focus',
     'analyze_opponent_exploitation',
+    'prepare_events',
 ]
@@ -7,6 +7,8 @@ import pandas as pd
 import numpy as np
 from typing import Dict, Any
 
+from .prepare import is_player_possession, leads_to_shot, is_true, value_counts, count_equal, masked_sum, masked_mean
+
 
 def analyze_final_third_entry(events_df: pd.DataFrame) -> Dict[str, Any]:
     """
@@ -25,12 +27,12 @@ def analyze_final_third_entry(events_df: pd.DataFrame) -> Dict[str, Any]:
 
         # Entry methods
         if 'event_type' in final_third_entries.columns:
-            metrics['pass_entries'] = (final_third_entries['event_type'] == 'pass').sum()
-            metrics['carry_entries'] = (final_third_entries['event_type'] == 'carry').sum()
+            metrics['pass_entries'] = count_equal(final_third_entries['event_type'], 'pass')
+            metrics['carry_entries'] = count_equal(final_third_entries['event_type'], 'carry')
 
         # Entry channels
         if 'channel_end' in final_third_entries.columns:
-            channel_entries = final_third_entries['channel_end'].value_counts(normalize=True).to_dict()
+            channel_entries = value_counts(final_third_entries['channel_end'], normalize=True).to_dict()
             metrics['entry_channels'] = channel_entries
 
         # Success rate
@@ -44,27 +46,28 @@ def analyze_shot_creation(events_df: pd.DataFrame) -> Dict[str, Any]:
     """
     Analyze shot creation and quality
     """
-    # Filter shots
-    shots = events_df[events_df['lead_to_shot'] == True] if 'lead_to_shot' in events_df.columns else pd.DataFrame()
+    # Shot mask; column reductions run on the masked arrays
+    shot_mask = leads_to_shot(events_df).to_numpy(dtype=bool) if 'lead_to_shot' in events_df.columns else None
 
     metrics = {}
 
-    if len(shots) > 0:
-        metrics['total_shots'] = len(shots)
+    if shot_mask is not None and shot_mask.any():
+        metrics['total_shots'] = int(np.count_nonzero(shot_mask))
 
         # Shot locations
-        if 'third_start' in shots.columns:
-            metrics['shots_from_penalty_area'] = (shots['penalty_area_start'] == True).sum() if 'penalty_area_start' in shots.columns else 0
+        if 'third_start' in events_df.columns:
+            metrics['shots_from_penalty_area'] = int(np.count_nonzero(shot_mask & is_true(events_df, 'penalty_area_start').to_numpy())) if 'penalty_area_start' in events_df.columns else 0
 
         # Expected threat
-        if 'xthreat' in shots.columns:
-            metrics['avg_xthreat_shot'] = shots['xthreat'].mean()
-            metrics['total_xthreat'] = shots['xthreat'].sum()
+        if 'xthreat' in events_df.columns:
+            metrics['avg_xthreat_shot'] = masked_mean(events_df['xthreat'], shot_mask)
+            metrics['total_xthreat'] = masked_sum(events_df['xthreat'], shot_mask)
 
         # Dangerous situations
-        if 'dangerous' in shots.columns:
-            metrics['dangerous_situations'] = shots['dangerous'].sum()
-            metrics['dangerous_rate'] = shots['dangerous'].mean()
+        if 'dangerous' in events_df.columns:
+            dangerous = events_df['dangerous'][shot_mask]
+            metrics['dangerous_situations'] = dangerous.sum()
+            metrics['dangerous_rate'] = dangerous.mean()
 
     return metrics
 
@@ -73,7 +76,7 @@ def analyze_passing_decisions(events_df: pd.DataFrame) -> Dict[str, Any]:
     """
     Compare actual decisions vs available options
     """
-    possessions = events_df[events_df['event_type'] == 'player_possession'] if 'event_type' in events_df.columns else pd.DataFrame()
+    possessions = events_df[is_player_possession(events_df)] if 'event_type' in events_df.columns else pd.DataFrame()
 
     metrics = {}
 
@@ -7,6 +7,8 @@ import pandas as pd
 import numpy as np
 from typing import Dict, Any
 
+from .prepare import pass_successful, is_pass, is_true, first_rows
+
 
 def analyze_passing_networks(events_df: pd.DataFrame) -> Dict[str, Any]:
     """
@@ -14,34 +16,44 @@ def analyze_passing_networks(events_df: pd.DataFrame) -> Dict[str, Any]:
     """
     # Filter successful passes
     passes = events_df[
-        (events_df['event_type'] == 'pass') &
-        (events_df['pass_outcome'] == 'successful')
+        is_pass(events_df) &
+        pass_successful(events_df)
     ] if 'event_type' in events_df.columns and 'pass_outcome' in events_df.columns else pd.DataFrame()
 
     metrics = {}
 
     if len(passes) > 0 and 'player_id' in passes.columns and 'player_targeted_id' in passes.columns:
-        # Count passes between players
-        pass_combinations = passes.groupby(['player_id', 'player_targeted_id']).size().reset_index(name='count')
-
-        if len(pass_combinations) > 0:
-            # Top combinations
-            top_combos = pass_combinations.nlargest(10, 'count')
+        # Count passes between players: factorize both ids (sorted, missing
+        # ids get code -1) and count combined pair codes in one pass
+        passer_codes, passer_ids = pd.factorize(passes['player_id'], sort=True)
+        receiver_codes, receiver_ids = pd.factorize(passes['player_targeted_id'], sort=True)
+        valid = (passer_codes >= 0) & (receiver_codes >= 0)
+        pair_codes, pair_counts = np.unique(
+            passer_codes[valid] * len(receiver_ids) + receiver_codes[valid],
+            return_counts=True
+        )
+
+        if len(pair_codes) > 0:
+            # Top combinations (ties keep passer/receiver id order)
+            top = np.argsort(-pair_counts, kind='stable')[:10]
 
             # Add player names if available
             if 'player_name' in passes.columns and 'player_targeted_name' in passes.columns:
+                # Name of each passer, taken from their first pass
+                player_names = first_rows(passes, ['player_name'])['player_name'].to_dict()
+
                 combo_details = []
-                for _, row in top_combos.iterrows():
-                    passer = passes[passes['player_id'] == row['player_id']]['player_name'].iloc[0] if len(passes[passes['player_id'] == row['player_id']]) > 0 else "Unknown"
-                    receiver = passes[passes['player_id'] == row['player_targeted_id']]['player_name'].iloc[0] if len(passes[passes['player_id'] == row['player_targeted_id']]) > 0 else "Unknown"
+                for pair_code, count in zip(pair_codes[top], pair_counts[top]):
+                    passer_id = passer_ids[pair_code // len(receiver_ids)]
+                    receiver_id = receiver_ids[pair_code % len(receiver_ids)]
                     combo_details.append({
-                        'passer': passer,
-                        'receiver': receiver,
-                        'passes': int(row['count'])
+                        'passer': player_names.get(passer_id, "Unknown"),
+                        'receiver': player_names.get(receiver_id, "Unknown"),
+                        'passes': int(count)
                     })
                 metrics['top_passing_combinations'] = combo_details
 
-            metrics['total_unique_combinations'] = len(pass_combinations)
+            metrics['total_unique_combinations'] = len(pair_codes)
 
     return metrics
 
@@ -58,11 +70,16 @@ def analyze_player_clusters(events_df: pd.DataFrame) -> Dict[str, Any]:
 
     # Give and go patterns
     if 'give_and_go' in events_df.columns:
-        give_and_gos = events_df[events_df['give_and_go'] == True]
-        metrics['total_give_and_gos'] = len(give_and_gos)
-
-        if len(give_and_gos) > 0 and 'player_id' in give_and_gos.columns:
-            top_give_and_go_players = give_and_gos['player_id'].value_counts().head(5).to_dict()
+        give_and_go_mask = is_true(events_df, 'give_and_go').to_numpy()
+        total_give_and_gos = int(np.count_nonzero(give_and_go_mask))
+        metrics['total_give_and_gos'] = total_give_and_gos
+
+        if total_give_and_gos > 0 and 'player_id' in events_df.columns:
+            # Count per player code, then rank the per-player counts (ties
+            # break as in value_counts)
+            codes, player_ids = pd.factorize(events_df['player_id'].to_numpy()[give_and_go_mask])
+            counts = pd.Series(np.bincount(codes[codes >= 0], minlength=len(player_ids)), index=player_ids)
+            top_give_and_go_players = counts.sort_values(ascending=False).head(5).to_dict()
             metrics['top_give_and_go_players'] = top_give_and_go_players
 
     return metrics
@@ -81,10 +98,15 @@ def analyze_team_cohesion(events_df: pd.DataFrame) -> Dict[str, Any]:
 
     # Distribution of touches
     if 'player_id' in events_df.columns:
-        touches_distribution = events_df['player_id'].value_counts()
+        # Touches per player from factorized ids (missing ids get code -1)
+        player_codes, _ = pd.factorize(events_df['player_id'])
+        touches_distribution = np.bincount(player_codes[player_codes >= 0])
         if len(touches_distribution) > 0:
             # Calculate coefficient of variation (lower = more even distribution)
-            cv = touches_distribution.std() / touches_distribution.mean()
+            cv = (
+                touches_distribution.std(ddof=1) / touches_distribution.mean()
+                if len(touches_distribution) > 1 else np.nan
+            )
             metrics['touch_distribution_balance'] = 1 / (1 + cv)  # Normalize to 0-1 scale
 
     return metrics
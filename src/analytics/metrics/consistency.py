@@ -7,6 +7,8 @@ import pandas as pd
 import numpy as np
 from typing import Dict, Any
 
+from .prepare import pass_successful, first_rows
+
 
 def analyze_pass_consistency(events_df: pd.DataFrame) -> Dict[str, Any]:
     """
@@ -15,16 +17,16 @@ def analyze_pass_consistency(events_df: pd.DataFrame) -> Dict[str, Any]:
     metrics = {}
 
     if 'pass_outcome' in events_df.columns and 'minute_start' in events_df.columns:
-        # Group by 15-minute windows
-        events_df = events_df.copy()
-        events_df['time_window'] = (events_df['minute_start'] // 15) * 15
+        # Group by 15-minute windows (events without a minute are skipped)
+        minutes = events_df['minute_start'].to_numpy(dtype=np.float64)
+        has_minute = ~np.isnan(minutes)
+        time_window = (minutes[has_minute] // 15).astype(np.int64)
+        successful = pass_successful(events_df).to_numpy(dtype=bool)[has_minute]
 
-        window_accuracies = []
-        for window in sorted(events_df['time_window'].unique()):
-            window_data = events_df[events_df['time_window'] == window]
-            if len(window_data) > 0:
-                accuracy = (window_data['pass_outcome'] == 'successful').mean()
-                window_accuracies.append(accuracy)
+        window_counts = np.bincount(time_window)
+        window_successes = np.bincount(time_window, weights=successful)
+        played = window_counts > 0
+        window_accuracies = window_successes[played] / window_counts[played]
 
         if len(window_accuracies) > 1:
             metrics['pass_accuracy_std'] = np.std(window_accuracies)
@@ -40,17 +42,26 @@ def analyze_phase_consistency(events_df: pd.DataFrame, phases_df: pd.DataFrame =
     metrics = {}
 
     if 'team_in_possession_phase_type' in events_df.columns:
-        for phase_type in ['build_up', 'create', 'finish']:
-            phase_data = events_df[events_df['team_in_possession_phase_type'] == phase_type]
+        # Per-phase rates from a single groupby over the phase column
+        rates = pd.DataFrame(index=events_df.index)
+        if 'pass_outcome' in events_df.columns:
+            rates['pass_accuracy'] = pass_successful(events_df)
+        if 'team_possession_loss_in_phase' in events_df.columns:
+            rates['possession_loss'] = events_df['team_possession_loss_in_phase'].astype(float)
 
-            if len(phase_data) > 0:
+        by_phase = rates.groupby(events_df['team_in_possession_phase_type'], observed=True)
+        phase_counts = by_phase.size()
+        phase_rates = by_phase.mean()
+
+        for phase_type in ['build_up', 'create', 'finish']:
+            if phase_counts.get(phase_type, 0) > 0:
                 phase_metrics = {}
 
-                if 'pass_outcome' in phase_data.columns:
-                    phase_metrics['pass_accuracy'] = (phase_data['pass_outcome'] == 'successful').mean()
+                if 'pass_accuracy' in phase_rates.columns:
+                    phase_metrics['pass_accuracy'] = phase_rates.at[phase_type, 'pass_accuracy']
 
-                if 'team_possession_loss_in_phase' in phase_data.columns:
-                    phase_metrics['retention_rate'] = 1 - phase_data['team_possession_loss_in_phase'].mean()
+                if 'possession_loss' in phase_rates.columns:
+                    phase_metrics['retention_rate'] = 1 - phase_rates.at[phase_type, 'possession_loss']
 
                 metrics[f'{phase_type}_consistency'] = phase_metrics
 
@@ -61,44 +72,63 @@ def analyze_player_consistency(events_df: pd.DataFrame) -> pd.DataFrame:
     """
     Analyze individual player consistency
     """
-    player_consistency = []
-
-    for player_id in events_df['player_id'].unique():
-        if pd.isna(player_id):
-            continue
-
-        player_data = events_df[events_df['player_id'] == player_id]
-
-        if len(player_data) < 10:  # Need minimum sample size
-            continue
-
-        player_name = player_data['player_name'].iloc[0] if 'player_name' in player_data.columns else f"Player {player_id}"
-        position = player_data['player_position'].iloc[0] if 'player_position' in player_data.columns else "Unknown"
-
-        consistency_metrics = {
-            'player_id': player_id,
-            'player_name': player_name,
-            'position': position,
-            'total_actions': len(player_data),
-        }
-
-        # Pass completion consistency
-        if 'pass_outcome' in player_data.columns and 'minute_start' in player_data.columns:
-            # Split into halves
-            first_half = player_data[player_data['period'] == 1] if 'period' in player_data.columns else pd.DataFrame()
-            second_half = player_data[player_data['period'] == 2] if 'period' in player_data.columns else pd.DataFrame()
-
-            if len(first_half) > 0 and len(second_half) > 0:
-                first_half_accuracy = (first_half['pass_outcome'] == 'successful').mean()
-                second_half_accuracy = (second_half['pass_outcome'] == 'successful').mean()
-
-                consistency_metrics['first_half_pass_accuracy'] = first_half_accuracy
-                consistency_metrics['second_half_pass_accuracy'] = second_half_accuracy
-                consistency_metrics['pass_accuracy_consistency'] = 1 - abs(first_half_accuracy - second_half_accuracy)
-
-        player_consistency.append(consistency_metrics)
-
-    return pd.DataFrame(player_consistency)
+    # Action counts per player, in order of first appearance
+    total_actions = events_df.groupby('player_id', sort=False).size()
+    total_actions = total_actions[total_actions >= 10]  # Need minimum sample size
+
+    if total_actions.empty:
+        return pd.DataFrame()
+
+    player_ids = total_actions.index
+
+    # Name and position come from each player's first event
+    first_events = first_rows(
+        events_df, [c for c in ('player_name', 'player_position') if c in events_df.columns]
+    )
+
+    player_consistency = pd.DataFrame({
+        'player_id': player_ids,
+        'player_name': (
+            first_events['player_name'].reindex(player_ids).to_numpy()
+            if 'player_name' in events_df.columns
+            else [f"Player {player_id}" for player_id in player_ids]
+        ),
+        'position': (
+            first_events['player_position'].reindex(player_ids).to_numpy()
+            if 'player_position' in events_df.columns
+            else "Unknown"
+        ),
+        'total_actions': total_actions.to_numpy(),
+    })
+
+    # Pass completion consistency
+    if {'pass_outcome', 'minute_start', 'period'}.issubset(events_df.columns):
+        # Split into halves
+        is_successful = pass_successful(events_df)
+        first_half = events_df['period'] == 1
+        second_half = events_df['period'] == 2
+
+        first_half_accuracy = (
+            is_successful[first_half].groupby(events_df['player_id'][first_half]).mean().reindex(player_ids)
+        )
+        second_half_accuracy = (
+            is_successful[second_half].groupby(events_df['player_id'][second_half]).mean().reindex(player_ids)
+        )
+
+        # Only players who appear in both halves get the comparison
+        both_halves = (first_half_accuracy.notna() & second_half_accuracy.notna()).to_numpy()
+
+        if both_halves.any():
+            first_half_accuracy = first_half_accuracy.to_numpy()
+            second_half_accuracy = second_half_accuracy.to_numpy()
+
+            player_consistency['first_half_pass_accuracy'] = np.where(both_halves, first_half_accuracy, np.nan)
+            player_consistency['second_half_pass_accuracy'] = np.where(both_halves, second_half_accuracy, np.nan)
+            player_consistency['pass_accuracy_consistency'] = np.where(
+                both_halves, 1 - np.abs(first_half_accuracy - second_half_accuracy), np.nan
+            )
+
+    return player_consistency
 
 
 def analyze_consistency(events_df: pd.DataFrame, phases_df: pd.DataFrame = None) -> Dict[str, Any]:
@@ -7,30 +7,36 @@ import pandas as pd
 import numpy as np
 from typing import Dict, Any
 
+from .prepare import value_counts, is_true, masked_mean
+
 
 def analyze_pressing_chains(events_df: pd.DataFrame) -> Dict[str, Any]:
     """
     Analyze pressing effectiveness
     """
-    pressing = events_df[events_df['pressing_chain'] == True] if 'pressing_chain' in events_df.columns else pd.DataFrame()
+    # Pressing mask; every metric reduces over the masked arrays
+    pressing_mask = is_true(events_df, 'pressing_chain').to_numpy() if 'pressing_chain' in events_df.columns else None
 
     metrics = {}
 
-    if len(pressing) > 0:
-        metrics['total_pressing_actions'] = len(pressing)
+    if pressing_mask is not None and pressing_mask.any():
+        total_actions = int(np.count_nonzero(pressing_mask))
+        metrics['total_pressing_actions'] = total_actions
 
-        if 'pressing_chain_index' in pressing.columns:
-            metrics['total_chains'] = pressing['pressing_chain_index'].nunique()
+        if 'pressing_chain_index' in events_df.columns:
+            chain_ids = events_df['pressing_chain_index'].to_numpy()[pressing_mask]
+            metrics['total_chains'] = np.unique(chain_ids[~pd.isna(chain_ids)]).size
 
-        if 'pressing_chain_length' in pressing.columns:
-            metrics['avg_chain_length'] = pressing['pressing_chain_length'].mean()
+        if 'pressing_chain_length' in events_df.columns:
+            metrics['avg_chain_length'] = masked_mean(events_df['pressing_chain_length'], pressing_mask)
 
-        if 'pressing_chain_end_type' in pressing.columns:
-            metrics['regain_rate'] = (pressing['pressing_chain_end_type'] == 'regain').mean()
-            metrics['disruption_rate'] = (pressing['pressing_chain_end_type'] == 'disruption').mean()
+        if 'pressing_chain_end_type' in events_df.columns:
+            end_type = events_df['pressing_chain_end_type']
+            metrics['regain_rate'] = np.count_nonzero(pressing_mask & (end_type == 'regain').to_numpy()) / total_actions
+            metrics['disruption_rate'] = np.count_nonzero(pressing_mask & (end_type == 'disruption').to_numpy()) / total_actions
 
-        if 'stop_possession_danger' in pressing.columns:
-            metrics['danger_stopped_rate'] = pressing['stop_possession_danger'].mean()
+        if 'stop_possession_danger' in events_df.columns:
+            metrics['danger_stopped_rate'] = events_df['stop_possession_danger'][pressing_mask].mean()
 
     return metrics
 
@@ -49,11 +55,13 @@ def analyze_defensive_line_height(events_df: pd.DataFrame) -> Dict[str, Any]:
         metrics['avg_line_height'] = events_df['last_defensive_line_height_start'].mean()
 
     # Defensive line by phase
-    if 'team_out_of_possession_phase_type' in events_df.columns:
+    if 'team_out_of_possession_phase_type' in events_df.columns and 'last_defensive_line_x_start' in events_df.columns:
+        phase_line_heights = events_df['last_defensive_line_x_start'].groupby(
+            events_df['team_out_of_possession_phase_type'], observed=True
+        ).mean()
         for phase in ['high_block', 'mid_block', 'low_block']:
-            phase_data = events_df[events_df['team_out_of_possession_phase_type'] == phase]
-            if len(phase_data) > 0 and 'last_defensive_line_x_start' in phase_data.columns:
-                metrics[f'defensive_line_height_{phase}'] = phase_data['last_defensive_line_x_start'].mean()
+            if phase in phase_line_heights.index:
+                metrics[f'defensive_line_height_{phase}'] = phase_line_heights[phase]
 
     return metrics
 
@@ -62,21 +70,23 @@ def analyze_defensive_engagements(events_df: pd.DataFrame) -> Dict[str, Any]:
     """
     Analyze defensive player engagements
     """
-    # Filter defensive events
-    defensive_events = events_df[events_df['event_type'].isin(['defensive_engagement', 'tackle', 'interception'])] if 'event_type' in events_df.columns else pd.DataFrame()
+    # Defensive event mask; reductions run on the masked arrays
+    defensive_mask = events_df['event_type'].isin(['defensive_engagement', 'tackle', 'interception']).to_numpy() if 'event_type' in events_df.columns else None
 
     metrics = {}
 
-    if len(defensive_events) > 0:
-        metrics['total_defensive_actions'] = len(defensive_events)
+    if defensive_mask is not None and defensive_mask.any():
+        total_actions = int(np.count_nonzero(defensive_mask))
+        metrics['total_defensive_actions'] = total_actions
 
         # Success rate
-        if 'end_type' in defensive_events.columns:
-            metrics['defensive_success_rate'] = (defensive_events['end_type'] == 'successful').mean()
+        if 'end_type' in events_df.columns:
+            successful = np.count_nonzero(defensive_mask & (events_df['end_type'] == 'successful').to_numpy())
+            metrics['defensive_success_rate'] = successful / total_actions
 
         # By location
-        if 'third_start' in defensive_events.columns:
-            location_dist = defensive_events['third_start'].value_counts(normalize=True).to_dict()
+        if 'third_start' in events_df.columns:
+            location_dist = value_counts(events_df['third_start'][defensive_mask], normalize=True).to_dict()
             metrics['defensive_actions_by_third'] = location_dist
 
     return metrics
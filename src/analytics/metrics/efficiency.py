@@ -7,6 +7,8 @@ import pandas as pd
 import numpy as np
 from typing import Dict, Any
 
+from .prepare import pass_successful, leads_to_shot, is_true, masked_sum, masked_mean
+
 
 def analyze_conversion_efficiency(events_df: pd.DataFrame) -> Dict[str, Any]:
     """
@@ -16,18 +18,19 @@ def analyze_conversion_efficiency(events_df: pd.DataFrame) -> Dict[str, Any]:
 
     # Shots analysis
     if 'lead_to_shot' in events_df.columns:
-        shot_events = events_df[events_df['lead_to_shot'] == True]
-        metrics['total_shots'] = len(shot_events)
+        shot_mask = leads_to_shot(events_df).to_numpy(dtype=bool)
+        total_shots = int(np.count_nonzero(shot_mask))
+        metrics['total_shots'] = total_shots
 
-        if 'lead_to_goal' in shot_events.columns:
-            goals = shot_events[shot_events['lead_to_goal'] == True]
-            metrics['total_goals'] = len(goals)
-            metrics['conversion_rate'] = len(goals) / len(shot_events) if len(shot_events) > 0 else 0
+        if 'lead_to_goal' in events_df.columns:
+            total_goals = int(np.count_nonzero(shot_mask & is_true(events_df, 'lead_to_goal').to_numpy()))
+            metrics['total_goals'] = total_goals
+            metrics['conversion_rate'] = total_goals / total_shots if total_shots > 0 else 0
 
         # xG analysis
-        if 'xshot_player_possession_max' in shot_events.columns:
-            metrics['total_xg'] = shot_events['xshot_player_possession_max'].sum()
-            metrics['avg_xg_per_shot'] = shot_events['xshot_player_possession_max'].mean()
+        if 'xshot_player_possession_max' in events_df.columns:
+            metrics['total_xg'] = masked_sum(events_df['xshot_player_possession_max'], shot_mask)
+            metrics['avg_xg_per_shot'] = masked_mean(events_df['xshot_player_possession_max'], shot_mask)
 
     return metrics
 
@@ -57,7 +60,8 @@ def analyze_possession_efficiency(events_df: pd.DataFrame, phases_df: pd.DataFra
             metrics['total_possessions'] = total_phases
 
             if 'lead_to_shot' in events_df.columns:
-                phases_with_shots = events_df[events_df['lead_to_shot'] == True]['phase_index'].nunique()
+                shot_phases = events_df['phase_index'].to_numpy()[leads_to_shot(events_df).to_numpy(dtype=bool)]
+                phases_with_shots = np.unique(shot_phases[~pd.isna(shot_phases)]).size
                 metrics['possession_to_shot_rate'] = phases_with_shots / total_phases if total_phases > 0 else 0
 
     return metrics
@@ -78,7 +82,7 @@ def analyze_final_third_efficiency(events_df: pd.DataFrame) -> Dict[str, Any]:
             metrics['final_third_to_shot_rate'] = final_third['lead_to_shot'].mean()
 
         if 'pass_outcome' in final_third.columns:
-            metrics['final_third_pass_accuracy'] = (final_third['pass_outcome'] == 'successful').mean()
+            metrics['final_third_pass_accuracy'] = pass_successful(final_third).mean()
 
         if 'team_possession_loss_in_phase' in final_third.columns:
             metrics['final_third_retention_rate'] = 1 - final_third['team_possession_loss_in_phase'].mean()
@@ -7,14 +7,16 @@ import pandas as pd
 import numpy as np
 from typing import Dict, Any
 
+from .prepare import pass_successful, is_player_possession, is_true, value_counts
+
 
 def identify_line_breaking_patterns(events_df: pd.DataFrame) -> Dict[str, Any]:
     """
     Where and how team breaks defensive lines
     """
     line_breaks = events_df[
-        (events_df['first_line_break'] == True) |
-        (events_df['last_line_break'] == True)
+        is_true(events_df, 'first_line_break') |
+        is_true(events_df, 'last_line_break')
     ] if 'first_line_break' in events_df.columns and 'last_line_break' in events_df.columns else pd.DataFrame()
 
     metrics = {}
@@ -30,12 +32,12 @@ def identify_line_breaking_patterns(events_df: pd.DataFrame) -> Dict[str, Any]:
 
         # Line break methods
         if 'furthest_line_break_type' in line_breaks.columns:
-            methods = line_breaks['furthest_line_break_type'].value_counts(normalize=True).to_dict()
+            methods = value_counts(line_breaks['furthest_line_break_type'], normalize=True).to_dict()
             metrics['line_break_methods'] = methods
 
         # By player position
         if 'player_position' in line_breaks.columns:
-            position_breaks = line_breaks.groupby('player_position').size().to_dict()
+            position_breaks = line_breaks.groupby('player_position', observed=True).size().to_dict()
             metrics['line_breaks_by_position'] = position_breaks
 
     return metrics
@@ -45,7 +47,7 @@ def analyze_decision_quality(events_df: pd.DataFrame) -> Dict[str, Any]:
     """
     Analyze quality of passing decisions
     """
-    possessions = events_df[events_df['event_type'] == 'player_possession'] if 'event_type' in events_df.columns else pd.DataFrame()
+    possessions = events_df[is_player_possession(events_df)] if 'event_type' in events_df.columns else pd.DataFrame()
 
     metrics = {}
 
@@ -61,11 +63,11 @@ def analyze_decision_quality(events_df: pd.DataFrame) -> Dict[str, Any]:
         if 'n_passing_options_ahead' in possessions.columns and 'pass_ahead' in possessions.columns:
             progressive_available = possessions[possessions['n_passing_options_ahead'] > 0]
             if len(progressive_available) > 0:
-                metrics['progressive_option_chosen_rate'] = (progressive_available['pass_ahead'] == True).mean()
+                metrics['progressive_option_chosen_rate'] = is_true(progressive_available, 'pass_ahead').mean()
 
         # Decision success rate
         if 'pass_outcome' in possessions.columns:
-            metrics['decision_success_rate'] = (possessions['pass_outcome'] == 'successful').mean()
+            metrics['decision_success_rate'] = pass_successful(possessions).mean()
 
     return metrics
 
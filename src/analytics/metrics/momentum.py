@@ -7,6 +7,8 @@ import pandas as pd
 import numpy as np
 from typing import Dict, Any, List
 
+from .prepare import pass_successful, leads_to_shot
+
 
 def analyze_performance_by_period(events_df: pd.DataFrame) -> Dict[str, Any]:
     """
@@ -15,21 +17,33 @@ def analyze_performance_by_period(events_df: pd.DataFrame) -> Dict[str, Any]:
     metrics = {}
 
     if 'period' in events_df.columns:
-        for period in events_df['period'].unique():
-            period_data = events_df[events_df['period'] == period]
+        # Per-period columns, aggregated in one groupby pass
+        period_columns = pd.DataFrame(index=events_df.index)
+        aggregations = {}
 
-            period_metrics = {
-                'total_actions': len(period_data),
-            }
+        if 'lead_to_shot' in events_df.columns:
+            period_columns['shots'] = leads_to_shot(events_df)
+            aggregations['shots'] = 'sum'
+
+        if 'xthreat' in events_df.columns:
+            period_columns['total_xthreat'] = events_df['xthreat']
+            aggregations['total_xthreat'] = 'sum'
+
+        if 'team_possession_loss_in_phase' in events_df.columns:
+            period_columns['possession_loss_rate'] = events_df['team_possession_loss_in_phase'].astype(float)
+            aggregations['possession_loss_rate'] = 'mean'
 
-            if 'lead_to_shot' in period_data.columns:
-                period_metrics['shots'] = period_data['lead_to_shot'].sum()
+        by_period = period_columns.groupby(events_df['period'], sort=False, observed=True)
+        period_sizes = by_period.size()
+        period_values = by_period.agg(aggregations) if aggregations else None
 
-            if 'xthreat' in period_data.columns:
-                period_metrics['total_xthreat'] = period_data['xthreat'].sum()
+        for period, total_actions in period_sizes.items():
+            period_metrics = {
+                'total_actions': total_actions,
+            }
 
-            if 'team_possession_loss_in_phase' in period_data.columns:
-                period_metrics['possession_loss_rate'] = period_data['team_possession_loss_in_phase'].mean()
+            for column in aggregations:
+                period_metrics[column] = period_values.at[period, column]
 
             metrics[f'period_{period}'] = period_metrics
 
@@ -44,35 +58,41 @@ def analyze_momentum_shifts(events_df: pd.DataFrame) -> Dict[str, Any]:
 
     # Analyze by time windows (15-minute intervals)
     if 'minute_start' in events_df.columns:
-        events_df = events_df.copy()
-        events_df['time_window'] = (events_df['minute_start'] // 15) * 15
+        time_window = (events_df['minute_start'] // 15) * 15
 
-        windows = []
-        for window in sorted(events_df['time_window'].unique()):
-            window_data = events_df[events_df['time_window'] == window]
+        # Per-window columns, summed in one groupby pass
+        window_columns = pd.DataFrame(index=events_df.index)
+
+        if 'xthreat' in events_df.columns:
+            window_columns['xthreat'] = events_df['xthreat']
+
+        if 'lead_to_shot' in events_df.columns:
+            window_columns['shots'] = leads_to_shot(events_df)
 
+        by_window = window_columns.groupby(time_window)
+        window_sizes = by_window.size()
+        window_sums = by_window.sum()
+        window_labels = [f"{int(window)}-{int(window+15)} min" for window in window_sizes.index]
+
+        windows = []
+        for position, label in enumerate(window_labels):
             window_metrics = {
-                'time_window': f"{int(window)}-{int(window+15)} min",
-                'actions': len(window_data),
+                'time_window': label,
+                'actions': window_sizes.iat[position],
             }
 
-            if 'xthreat' in window_data.columns:
-                window_metrics['xthreat'] = window_data['xthreat'].sum()
-
-            if 'lead_to_shot' in window_data.columns:
-                window_metrics['shots'] = window_data['lead_to_shot'].sum()
+            for column in window_sums.columns:
+                window_metrics[column] = window_sums[column].iat[position]
 
             windows.append(window_metrics)
 
         metrics['time_windows'] = windows
 
         # Identify best and worst periods
-        if windows:
-            if any('xthreat' in w for w in windows):
-                best_window = max(windows, key=lambda x: x.get('xthreat', 0))
-                worst_window = min(windows, key=lambda x: x.get('xthreat', 0))
-                metrics['strongest_period'] = best_window['time_window']
-                metrics['weakest_period'] = worst_window['time_window']
+        if windows and 'xthreat' in window_sums.columns:
+            window_xthreat = window_sums['xthreat'].to_numpy()
+            metrics['strongest_period'] = window_labels[int(np.argmax(window_xthreat))]
+            metrics['weakest_period'] = window_labels[int(np.argmin(window_xthreat))]
 
     return metrics
 
@@ -84,28 +104,39 @@ def analyze_game_state_performance(events_df: pd.DataFrame) -> Dict[str, Any]:
     metrics = {}
 
     if 'team_score' in events_df.columns and 'opponent_team_score' in events_df.columns:
-        events_df = events_df.copy()
-
         # Determine game state
-        events_df['game_state_type'] = events_df.apply(
-            lambda row: 'winning' if row['team_score'] > row['opponent_team_score']
-            else ('losing' if row['team_score'] < row['opponent_team_score'] else 'drawing'),
-            axis=1
+        team_score = events_df['team_score'].to_numpy()
+        opponent_score = events_df['opponent_team_score'].to_numpy()
+        game_state = np.select(
+            [team_score > opponent_score, team_score < opponent_score],
+            ['winning', 'losing'],
+            default='drawing'
         )
 
-        for state in ['winning', 'drawing', 'losing']:
-            state_data = events_df[events_df['game_state_type'] == state]
+        # Per-state columns, aggregated in one groupby pass
+        state_columns = pd.DataFrame(index=events_df.index)
+        aggregations = {}
 
-            if len(state_data) > 0:
+        if 'lead_to_shot' in events_df.columns:
+            state_columns['shots'] = leads_to_shot(events_df)
+            aggregations['shots'] = 'sum'
+
+        if 'pass_outcome' in events_df.columns:
+            state_columns['pass_accuracy'] = pass_successful(events_df)
+            aggregations['pass_accuracy'] = 'mean'
+
+        by_state = state_columns.groupby(game_state)
+        state_sizes = by_state.size()
+        state_values = by_state.agg(aggregations) if aggregations else None
+
+        for state in ['winning', 'drawing', 'losing']:
+            if state in state_sizes.index:
                 state_metrics = {
-                    'actions': len(state_data),
+                    'actions': state_sizes[state],
                 }
 
-                if 'lead_to_shot' in state_data.columns:
-                    state_metrics['shots'] = state_data['lead_to_shot'].sum()
-
-                if 'pass_outcome' in state_data.columns:
-                    state_metrics['pass_accuracy'] = (state_data['pass_outcome'] == 'successful').mean()
+                for column in aggregations:
+                    state_metrics[column] = state_values.at[state, column]
 
                 metrics[state] = state_metrics
 
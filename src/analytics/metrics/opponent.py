@@ -7,6 +7,8 @@ import pandas as pd
 import numpy as np
 from typing import Dict, Any, List
 
+from .prepare import pass_successful, leads_to_shot, is_true, value_counts
+
 
 def identify_opponent_vulnerabilities(events_df: pd.DataFrame) -> Dict[str, Any]:
     """
@@ -16,7 +18,7 @@ def identify_opponent_vulnerabilities(events_df: pd.DataFrame) -> Dict[str, Any]
 
     # Analyze successful attacks by zone
     if 'channel_start' in events_df.columns and 'lead_to_shot' in events_df.columns:
-        channel_success = events_df.groupby('channel_start')['lead_to_shot'].agg(['sum', 'mean', 'count'])
+        channel_success = events_df.groupby('channel_start', observed=True)['lead_to_shot'].agg(['sum', 'mean', 'count'])
 
         # Find most successful channels
         if len(channel_success) > 0:
@@ -30,20 +32,22 @@ def identify_opponent_vulnerabilities(events_df: pd.DataFrame) -> Dict[str, Any]
                 })
 
     # Analyze opponent pressing weaknesses
-    if 'team_out_of_possession_phase_type' in events_df.columns and 'pass_outcome' in events_df.columns:
+    if {'team_out_of_possession_phase_type', 'pass_outcome', 'team_possession_loss_in_phase'}.issubset(events_df.columns):
+        # Possession loss rate per opponent phase, from one groupby pass
+        phase_loss_rates = events_df['team_possession_loss_in_phase'].astype(float).groupby(
+            events_df['team_out_of_possession_phase_type'], observed=True
+        ).mean()
+
         for phase in ['high_block', 'mid_block', 'low_block']:
-            phase_data = events_df[events_df['team_out_of_possession_phase_type'] == phase]
-            if len(phase_data) > 0:
-                success_vs_phase = (phase_data['pass_outcome'] == 'successful').mean()
-                if 'team_possession_loss_in_phase' in phase_data.columns:
-                    retention_vs_phase = 1 - phase_data['team_possession_loss_in_phase'].mean()
-
-                    if retention_vs_phase > 0.75:  # Strong performance against this phase
-                        vulnerabilities.append({
-                            'area': f'Effective vs {phase}',
-                            'success_rate': retention_vs_phase,
-                            'recommendation': f'Continue exploiting opponent {phase} with current tactics'
-                        })
+            if phase in phase_loss_rates.index:
+                retention_vs_phase = 1 - phase_loss_rates[phase]
+
+                if retention_vs_phase > 0.75:  # Strong performance against this phase
+                    vulnerabilities.append({
+                        'area': f'Effective vs {phase}',
+                        'success_rate': retention_vs_phase,
+                        'recommendation': f'Continue exploiting opponent {phase} with current tactics'
+                    })
 
     return {'vulnerabilities': vulnerabilities}
 
@@ -54,36 +58,33 @@ def analyze_successful_patterns(events_df: pd.DataFrame) -> Dict[str, Any]:
     """
     patterns = []
 
+    # Events that led to a shot, shared by both pattern checks
+    shots = events_df[leads_to_shot(events_df)] if 'lead_to_shot' in events_df.columns else pd.DataFrame()
+
     # Successful build-up patterns
-    if 'team_in_possession_phase_type' in events_df.columns and 'lead_to_shot' in events_df.columns:
-        successful_phases = events_df[events_df['lead_to_shot'] == True]
-
-        if len(successful_phases) > 0:
-            # Phase type distribution for successful attacks
-            phase_dist = successful_phases['team_in_possession_phase_type'].value_counts(normalize=True).to_dict()
-
-            for phase, rate in phase_dist.items():
-                if rate > 0.3:  # Significant contribution
-                    patterns.append({
-                        'pattern': f'Success through {phase}',
-                        'frequency': rate,
-                        'recommendation': f'Emphasize {phase} phase in attack'
-                    })
+    if 'team_in_possession_phase_type' in events_df.columns and len(shots) > 0:
+        # Phase type distribution for successful attacks
+        phase_dist = value_counts(shots['team_in_possession_phase_type'], normalize=True)
+
+        for phase, rate in phase_dist[phase_dist > 0.3].items():  # Significant contribution
+            patterns.append({
+                'pattern': f'Success through {phase}',
+                'frequency': rate,
+                'recommendation': f'Emphasize {phase} phase in attack'
+            })
 
     # Successful passing patterns
-    if 'pass_range' in events_df.columns and 'lead_to_shot' in events_df.columns:
-        shots = events_df[events_df['lead_to_shot'] == True]
-        if len(shots) > 0:
-            # What pass types led to shots
-            pass_types_to_shots = shots['pass_range'].value_counts(normalize=True).to_dict()
-
-            top_pass_type = max(pass_types_to_shots.items(), key=lambda x: x[1]) if pass_types_to_shots else None
-            if top_pass_type:
-                patterns.append({
-                    'pattern': f'Shots via {top_pass_type[0]} passes',
-                    'frequency': top_pass_type[1],
-                    'recommendation': f'Continue using {top_pass_type[0]} passes to create chances'
-                })
+    if 'pass_range' in events_df.columns and len(shots) > 0:
+        # What pass types led to shots (sorted, so the first entry is the top one)
+        pass_types_to_shots = value_counts(shots['pass_range'], normalize=True)
+
+        if len(pass_types_to_shots) > 0:
+            top_pass_type, top_rate = pass_types_to_shots.index[0], pass_types_to_shots.iat[0]
+            patterns.append({
+                'pattern': f'Shots via {top_pass_type} passes',
+                'frequency': top_rate,
+                'recommendation': f'Continue using {top_pass_type} passes to create chances'
+            })
 
     return {'patterns': patterns}
 
@@ -113,8 +114,8 @@ def suggest_tactical_adjustments(events_df: pd.DataFrame) -> List[Dict[str, Any]
 
     # Analyze pressing intensity
     if 'pressing_chain' in events_df.columns:
-        pressing_events = events_df[events_df['pressing_chain'] == True]
-        pressing_rate = len(pressing_events) / len(events_df) if len(events_df) > 0 else 0
+        pressing_count = np.count_nonzero(is_true(events_df, 'pressing_chain').to_numpy())
+        pressing_rate = pressing_count / len(events_df) if len(events_df) > 0 else 0
 
         if pressing_rate > 0.2:
             adjustments.append({
@@ -131,11 +132,12 @@ def suggest_tactical_adjustments(events_df: pd.DataFrame) -> List[Dict[str, Any]
 
     # Width exploitation
     if 'channel_start' in events_df.columns:
-        wide_actions = events_df[events_df['channel_start'].isin(['wide_left', 'wide_right'])]
-        wide_rate = len(wide_actions) / len(events_df) if len(events_df) > 0 else 0
+        wide_mask = events_df['channel_start'].isin(['wide_left', 'wide_right']).to_numpy()
+        wide_count = np.count_nonzero(wide_mask)
+        wide_rate = wide_count / len(events_df) if len(events_df) > 0 else 0
 
-        if 'pass_outcome' in wide_actions.columns and len(wide_actions) > 0:
-            wide_success = (wide_actions['pass_outcome'] == 'successful').mean()
+        if 'pass_outcome' in events_df.columns and wide_count > 0:
+            wide_success = np.count_nonzero(pass_successful(events_df).to_numpy() & wide_mask) / wide_count
             if wide_success > 0.75:
                 adjustments.append({
                     'adjustment': 'Increase Width',
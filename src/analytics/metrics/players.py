@@ -7,65 +7,104 @@ import pandas as pd
 import numpy as np
 from typing import Dict, Any
 
+from .prepare import pass_successful, is_pass, leads_to_shot, is_true, is_line_break, first_rows
+
 
 def analyze_player_performance(events_df: pd.DataFrame) -> pd.DataFrame:
     """
     Comprehensive individual player performance metrics
     """
-    player_stats = []
-
-    for player_id in events_df['player_id'].unique():
-        if pd.isna(player_id):
-            continue
-
-        player_data = events_df[events_df['player_id'] == player_id]
-
-        if len(player_data) == 0:
-            continue
-
-        player_name = player_data['player_name'].iloc[0] if 'player_name' in player_data.columns else f"Player {player_id}"
-        position = player_data['player_position'].iloc[0] if 'player_position' in player_data.columns else "Unknown"
-
-        stats = {
-            'player_id': player_id,
-            'player_name': player_name,
-            'position': position,
-            'total_actions': len(player_data),
-        }
-
-        # Passing metrics
-        if 'pass_outcome' in player_data.columns:
-            passes = player_data[player_data['event_type'] == 'pass'] if 'event_type' in player_data.columns else player_data
-            if len(passes) > 0:
-                stats['total_passes'] = len(passes)
-                stats['pass_completion_rate'] = (passes['pass_outcome'] == 'successful').mean()
-
-        # Progressive actions
-        if 'pass_ahead' in player_data.columns:
-            stats['progressive_passes'] = (player_data['pass_ahead'] == True).sum()
-
-        if 'carry' in player_data.columns:
-            stats['progressive_carries'] = (player_data['carry'] == True).sum()
-
-        # Line breaks
-        if 'first_line_break' in player_data.columns:
-            stats['line_breaks'] = (player_data['first_line_break'] | player_data['last_line_break']).sum() if 'last_line_break' in player_data.columns else 0
-
-        # Threat creation
-        if 'xthreat' in player_data.columns:
-            stats['total_xthreat'] = player_data['xthreat'].sum()
-            stats['avg_xthreat_per_action'] = player_data['xthreat'].mean()
-
-        if 'lead_to_shot' in player_data.columns:
-            stats['shot_assists'] = player_data['lead_to_shot'].sum()
-
-        # Defensive actions
-        if 'pressing_chain' in player_data.columns:
-            stats['pressing_actions'] = (player_data['pressing_chain'] == True).sum()
-
-        player_stats.append(stats)
-
-    return pd.DataFrame(player_stats)
+    # Per-event columns, summed per player in one groupby pass
+    event_columns = pd.DataFrame(index=events_df.index)
+
+    if 'pass_outcome' in events_df.columns:
+        passes = is_pass(events_df) if 'event_type' in events_df.columns else pd.Series(True, index=events_df.index)
+        event_columns['total_passes'] = passes
+        event_columns['successful_passes'] = passes & pass_successful(events_df)
+
+    if 'pass_ahead' in events_df.columns:
+        event_columns['progressive_passes'] = is_true(events_df, 'pass_ahead')
+
+    if 'carry' in events_df.columns:
+        event_columns['progressive_carries'] = is_true(events_df, 'carry')
+
+    if 'first_line_break' in events_df.columns and 'last_line_break' in events_df.columns:
+        event_columns['line_breaks'] = is_line_break(events_df)
+
+    if 'xthreat' in events_df.columns:
+        event_columns['total_xthreat'] = events_df['xthreat']
+
+    if 'lead_to_shot' in events_df.columns:
+        event_columns['shot_assists'] = leads_to_shot(events_df)
+
+    if 'pressing_chain' in events_df.columns:
+        event_columns['pressing_actions'] = is_true(events_df, 'pressing_chain')
+
+    # Players in order of first appearance; events without a player are dropped
+    by_player = event_columns.groupby(events_df['player_id'], sort=False)
+    total_actions = by_player.size()
+
+    if total_actions.empty:
+        return pd.DataFrame()
+
+    player_ids = total_actions.index
+    totals = by_player.sum()
+
+    # Name and position come from each player's first event
+    first_events = first_rows(
+        events_df, [c for c in ('player_name', 'player_position') if c in events_df.columns]
+    )
+
+    player_stats = pd.DataFrame({
+        'player_id': player_ids,
+        'player_name': (
+            first_events['player_name'].reindex(player_ids).to_numpy()
+            if 'player_name' in events_df.columns
+            else [f"Player {player_id}" for player_id in player_ids]
+        ),
+        'position': (
+            first_events['player_position'].reindex(player_ids).to_numpy()
+            if 'player_position' in events_df.columns
+            else "Unknown"
+        ),
+        'total_actions': total_actions.to_numpy(),
+    })
+
+    # Passing metrics (only for players with passes)
+    if 'total_passes' in totals.columns:
+        total_passes = totals['total_passes'].to_numpy()
+        has_passes = total_passes > 0
+        if has_passes.any():
+            if has_passes.all():
+                player_stats['total_passes'] = total_passes
+            else:
+                player_stats['total_passes'] = np.where(has_passes, total_passes, np.nan)
+            player_stats['pass_completion_rate'] = np.where(
+                has_passes, totals['successful_passes'].to_numpy() / np.maximum(total_passes, 1), np.nan
+            )
+
+    # Progressive actions
+    for column in ('progressive_passes', 'progressive_carries'):
+        if column in totals.columns:
+            player_stats[column] = totals[column].to_numpy()
+
+    # Line breaks
+    if 'first_line_break' in events_df.columns:
+        player_stats['line_breaks'] = totals['line_breaks'].to_numpy() if 'line_breaks' in totals.columns else 0
+
+    # Threat creation
+    if 'total_xthreat' in totals.columns:
+        player_stats['total_xthreat'] = totals['total_xthreat'].to_numpy()
+        player_stats['avg_xthreat_per_action'] = by_player['total_xthreat'].mean().to_numpy()
+
+    if 'shot_assists' in totals.columns:
+        player_stats['shot_assists'] = totals['shot_assists'].to_numpy()
+
+    # Defensive actions
+    if 'pressing_actions' in totals.columns:
+        player_stats['pressing_actions'] = totals['pressing_actions'].to_numpy()
+
+    return player_stats
 
 
 def identify_key_players(player_df: pd.DataFrame) -> Dict[str, Any]:
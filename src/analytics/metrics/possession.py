@@ -7,13 +7,23 @@ import pandas as pd
 import numpy as np
 from typing import Dict, Any, Tuple
 
+from .prepare import pass_successful, is_true, equals_mask, first_rows, value_counts
 
-def deep_buildup_analysis(events_df: pd.DataFrame) -> Dict[str, Any]:
+
+def select_buildup_events(events_df: pd.DataFrame) -> pd.DataFrame:
     """
-    Comprehensive build-up pattern analysis
+    Events played in build-up phases
     """
-    buildup_phases = events_df[events_df['team_in_possession_phase_type'] == 'build_up']
+    return events_df[events_df['team_in_possession_phase_type'] == 'build_up']
+
 
+def deep_buildup_analysis(buildup_phases: pd.DataFrame) -> Dict[str, Any]:
+    """
+    Comprehensive build-up pattern analysis
+
+    Args:
+        buildup_phases: Build-up events (see select_buildup_events)
+    """
     if len(buildup_phases) == 0:
         return {}
 
@@ -29,8 +39,8 @@ def deep_buildup_analysis(events_df: pd.DataFrame) -> Dict[str, Any]:
         'avg_buildup_duration': buildup_phases['duration'].mean() if 'duration' in buildup_phases.columns else 0,
 
         # Carries vs passes for progression
-        'carry_progression_rate': (buildup_phases['carry'] == True).mean() if 'carry' in buildup_phases.columns else 0,
-        'carry_distance_avg': buildup_phases[buildup_phases['carry'] == True]['distance_covered'].mean() if 'carry' in buildup_phases.columns and 'distance_covered' in buildup_phases.columns else 0,
+        'carry_progression_rate': is_true(buildup_phases, 'carry').mean() if 'carry' in buildup_phases.columns else 0,
+        'carry_distance_avg': buildup_phases[is_true(buildup_phases, 'carry')]['distance_covered'].mean() if 'carry' in buildup_phases.columns and 'distance_covered' in buildup_phases.columns else 0,
 
         # Success rate
         'buildup_success_rate': 1 - buildup_phases['team_possession_loss_in_phase'].mean() if 'team_possession_loss_in_phase' in buildup_phases.columns else 0,
@@ -42,85 +52,111 @@ def deep_buildup_analysis(events_df: pd.DataFrame) -> Dict[str, Any]:
 
     # Channel preference during build-up
     if 'channel_start' in buildup_phases.columns:
-        channel_usage = buildup_phases['channel_start'].value_counts(normalize=True).to_dict()
+        channel_usage = value_counts(buildup_phases['channel_start'], normalize=True).to_dict()
         metrics['buildup_channel_usage'] = channel_usage
 
     return metrics
 
 
-def buildup_player_roles(events_df: pd.DataFrame) -> pd.DataFrame:
+def buildup_player_roles(buildup: pd.DataFrame) -> pd.DataFrame:
     """
     Identify who does what in build-up
-    """
-    buildup = events_df[events_df['team_in_possession_phase_type'] == 'build_up']
 
+    Args:
+        buildup: Build-up events (see select_buildup_events)
+    """
     if len(buildup) == 0:
         return pd.DataFrame()
 
-    player_roles = []
+    # Per-event columns, aggregated per player in one groupby pass
+    event_columns = pd.DataFrame(index=buildup.index)
+
+    if 'pass_ahead' in buildup.columns:
+        event_columns['progressive_passes'] = is_true(buildup, 'pass_ahead')
+
+    if 'carry' in buildup.columns:
+        event_columns['progressive_carries'] = is_true(buildup, 'carry')
 
-    for player_id in buildup['player_id'].unique():
-        if pd.isna(player_id):
-            continue
+    if 'pass_outcome' in buildup.columns:
+        event_columns['pass_success_rate'] = pass_successful(buildup)
 
-        player_buildup = buildup[buildup['player_id'] == player_id]
+    # Players in order of first appearance; events without a player are dropped
+    by_player = event_columns.groupby(buildup['player_id'], sort=False)
+    involvements = by_player.size()
 
-        if len(player_buildup) == 0:
-            continue
+    if involvements.empty:
+        return pd.DataFrame()
 
-        player_name = player_buildup['player_name'].iloc[0] if 'player_name' in player_buildup.columns else f"Player {player_id}"
-        position = player_buildup['player_position'].iloc[0] if 'player_position' in player_buildup.columns else "Unknown"
+    player_ids = involvements.index
+    total_phases = buildup['phase_index'].nunique() if 'phase_index' in buildup.columns else 0
 
-        role_metrics = {
-            'player_id': player_id,
-            'player_name': player_name,
-            'position': position,
+    # Name and position come from each player's first build-up event
+    first_events = first_rows(
+        buildup, [c for c in ('player_name', 'player_position') if c in buildup.columns]
+    )
 
-            # Involvement rate
-            'buildup_involvements': len(player_buildup),
-            'buildup_involvements_per_phase': len(player_buildup) / buildup['phase_index'].nunique() if 'phase_index' in buildup.columns and buildup['phase_index'].nunique() > 0 else 0,
+    player_roles = pd.DataFrame({
+        'player_id': player_ids,
+        'player_name': (
+            first_events['player_name'].reindex(player_ids).to_numpy()
+            if 'player_name' in buildup.columns
+            else [f"Player {player_id}" for player_id in player_ids]
+        ),
+        'position': (
+            first_events['player_position'].reindex(player_ids).to_numpy()
+            if 'player_position' in buildup.columns
+            else "Unknown"
+        ),
 
-            # Progression contribution
-            'progressive_passes': (player_buildup['pass_ahead'] == True).sum() if 'pass_ahead' in player_buildup.columns else 0,
-            'progressive_carries': (player_buildup['carry'] == True).sum() if 'carry' in player_buildup.columns else 0,
+        # Involvement rate
+        'buildup_involvements': involvements.to_numpy(),
+        'buildup_involvements_per_phase': involvements.to_numpy() / total_phases if total_phases > 0 else 0,
 
-            # Pass success under pressure
-            'pass_success_rate': (player_buildup['pass_outcome'] == 'successful').mean() if 'pass_outcome' in player_buildup.columns else 0,
-        }
+        # Progression contribution
+        'progressive_passes': by_player['progressive_passes'].sum().to_numpy() if 'pass_ahead' in buildup.columns else 0,
+        'progressive_carries': by_player['progressive_carries'].sum().to_numpy() if 'carry' in buildup.columns else 0,
 
-        player_roles.append(role_metrics)
+        # Pass success under pressure
+        'pass_success_rate': by_player['pass_success_rate'].mean().to_numpy() if 'pass_outcome' in buildup.columns else 0,
+    })
 
-    return pd.DataFrame(player_roles)
+    return player_roles
 
 
 def pressure_resistance_analysis(events_df: pd.DataFrame) -> Tuple[Dict[str, Any], pd.DataFrame, pd.DataFrame]:
     """
     How team handles being pressed
     """
-    # High pressure situations
-    high_pressure = events_df[
-        (events_df['xloss_player_possession_start'] > 0.3) |
-        (events_df['team_out_of_possession_phase_type'] == 'high_block')
-    ] if 'xloss_player_possession_start' in events_df.columns and 'team_out_of_possession_phase_type' in events_df.columns else pd.DataFrame()
-
-    normal_pressure = events_df[
-        (events_df['xloss_player_possession_start'] <= 0.3) &
-        (events_df['team_out_of_possession_phase_type'] != 'high_block')
-    ] if 'xloss_player_possession_start' in events_df.columns and 'team_out_of_possession_phase_type' in events_df.columns else pd.DataFrame()
+    # High and normal pressure masks (events without an xloss value are in neither)
+    if 'xloss_player_possession_start' in events_df.columns and 'team_out_of_possession_phase_type' in events_df.columns:
+        xloss = events_df['xloss_player_possession_start'].to_numpy(dtype=np.float64)
+        high_block = equals_mask(events_df['team_out_of_possession_phase_type'], 'high_block')
+        high_mask = (xloss > 0.3) | high_block
+        normal_mask = (xloss <= 0.3) & ~high_block
+        high_pressure = events_df[high_mask]
+        normal_pressure = events_df[normal_mask]
+    else:
+        high_mask = normal_mask = None
+        high_pressure = normal_pressure = pd.DataFrame()
 
     metrics = {}
 
     if len(high_pressure) > 0 and len(normal_pressure) > 0:
+        high_count = np.count_nonzero(high_mask)
+        normal_count = np.count_nonzero(normal_mask)
+
         # Success rate comparison
         if 'pass_outcome' in events_df.columns:
-            metrics['pass_success_high_pressure'] = (high_pressure['pass_outcome'] == 'successful').mean()
-            metrics['pass_success_normal_pressure'] = (normal_pressure['pass_outcome'] == 'successful').mean()
+            successful = pass_successful(events_df).to_numpy(dtype=bool)
+            metrics['pass_success_high_pressure'] = np.count_nonzero(successful & high_mask) / high_count
+            metrics['pass_success_normal_pressure'] = np.count_nonzero(successful & normal_mask) / normal_count
             metrics['pressure_impact'] = metrics['pass_success_normal_pressure'] - metrics['pass_success_high_pressure']
 
         # Tactical response to pressure
         if 'pass_range' in events_df.columns:
-            metrics['long_ball_under_pressure_rate'] = (high_pressure['pass_range'] == 'long').mean()
-            metrics['long_ball_normal_rate'] = (normal_pressure['pass_range'] == 'long').mean()
+            long_ball = (events_df['pass_range'] == 'long').to_numpy()
+            metrics['long_ball_under_pressure_rate'] = np.count_nonzero(long_ball & high_mask) / high_count
+            metrics['long_ball_normal_rate'] = np.count_nonzero(long_ball & normal_mask) / normal_count
 
         # Turnover rate
         if 'team_possession_loss_in_phase' in events_df.columns:
@@ -146,12 +182,15 @@ def analyze_possession_buildup(events_df: pd.DataFrame, phases_df: pd.DataFrame
         'metrics': {}
     }
 
+    # Build-up events are filtered once and shared by both analyses
+    buildup_events = select_buildup_events(events_df)
+
     # Build-up analysis
-    buildup_metrics = deep_buildup_analysis(events_df)
+    buildup_metrics = deep_buildup_analysis(buildup_events)
     results['metrics']['buildup'] = buildup_metrics
 
     # Player roles in build-up
-    player_roles = buildup_player_roles(events_df)
+    player_roles = buildup_player_roles(buildup_events)
     results['metrics']['player_roles'] = player_roles.to_dict('records') if not player_roles.empty else []
 
     # Pressure resistance
@@ -0,0 +1,280 @@
+"""
+Shared event preparation
+Precomputes masks and dtypes that several analysis sections would otherwise rebuild
+"""
+
+import pandas as pd
+import numpy as np
+from typing import Callable, List
+
+# Low-cardinality string columns filtered on across sections, stored as
+# categoricals so equality checks compare integer codes
+CATEGORICAL_COLUMNS = [
+    'pass_outcome',
+    'event_type',
+    'event_subtype',
+    'third_start',
+    'third_end',
+    'channel_start',
+    'channel_end',
+    'team_in_possession_phase_type',
+    'team_out_of_possession_phase_type',
+    'current_team_in_possession_previous_phase_type',
+    'current_team_in_possession_next_phase_type',
+    'pressing_chain_end_type',
+    'furthest_line_break_type',
+    'player_position',
+    'pass_range',
+    'speed_avg_band',
+    'game_interruption_before',
+]
+
+# Count/minute/score columns stored as int32 (values are far below the
+# int32 range; pandas still accumulates integer sums and means in 64 bits).
+# Float metrics keep float64 so aggregates are unchanged, and flag columns
+# with missing values stay object so NaN is not counted as False.
+INT32_COLUMNS = [
+    'period',
+    'minute_start',
+    'phase_index',
+    'team_score',
+    'opponent_team_score',
+    'pressing_chain_length',
+    'n_passing_options',
+    'n_passing_options_dangerous_not_difficult',
+    'n_passing_options_line_break',
+    'n_passing_options_ahead',
+    'n_simultaneous_passing_options',
+]
+
+_INT32_INFO = np.iinfo(np.int32)
+
+# Precomputed mask columns added by prepare_events
+PASS_SUCCESSFUL_COLUMN = '_pass_successful'
+IS_PASS_COLUMN = '_is_pass'
+IS_PLAYER_POSSESSION_COLUMN = '_is_player_possession'
+LEAD_TO_SHOT_COLUMN = '_lead_to_shot'
+
+
+def _successful_pass_mask(df: pd.DataFrame) -> pd.Series:
+    return df['pass_outcome'] == 'successful'
+
+
+def _pass_mask(df: pd.DataFrame) -> pd.Series:
+    return df['event_type'] == 'pass'
+
+
+def _player_possession_mask(df: pd.DataFrame) -> pd.Series:
+    return df['event_type'] == 'player_possession'
+
+
+def _lead_to_shot_mask(df: pd.DataFrame) -> pd.Series:
+    return df['lead_to_shot'] == True
+
+
+# Flag columns compared with == True in several sections; prepare_events
+# stores each as a '_<column>' boolean mask (missing values are False)
+FLAG_COLUMNS = [
+    'carry',
+    'pass_ahead',
+    'pressing_chain',
+    'give_and_go',
+    'first_line_break',
+    'last_line_break',
+    'lead_to_goal',
+    'penalty_area_start',
+]
+
+
+# Mask column -> (source column, mask function)
+_MASKS = {
+    PASS_SUCCESSFUL_COLUMN: ('pass_outcome', _successful_pass_mask),
+    IS_PASS_COLUMN: ('event_type', _pass_mask),
+    IS_PLAYER_POSSESSION_COLUMN: ('event_type', _player_possession_mask),
+    LEAD_TO_SHOT_COLUMN: ('lead_to_shot', _lead_to_shot_mask),
+}
+
+
+def prepare_events(events_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Add precomputed boolean mask columns to an events dataframe
+
+    Args:
+        events_df: Events dataframe
+
+    Returns:
+        Shallow copy of events_df with CATEGORICAL_COLUMNS converted to
+        categoricals, INT32_COLUMNS downcast and the mask and FLAG_COLUMNS
+        mask columns added (columns that are missing
+        are skipped)
+    """
+    prepared = events_df.copy(deep=False)
+
+    for column in CATEGORICAL_COLUMNS:
+        if column in prepared.columns and prepared[column].dtype == object:
+            prepared[column] = prepared[column].astype('category')
+
+    for column in INT32_COLUMNS:
+        if column in prepared.columns and prepared[column].dtype == np.int64:
+            values = prepared[column].to_numpy()
+            if len(values) == 0 or (values.min() >= _INT32_INFO.min and values.max() <= _INT32_INFO.max):
+                prepared[column] = values.astype(np.int32)
+
+    for mask_column, (source_column, mask_function) in _MASKS.items():
+        if source_column in prepared.columns:
+            prepared[mask_column] = mask_function(prepared).to_numpy(dtype=bool)
+
+    for column in FLAG_COLUMNS:
+        if column in prepared.columns:
+            prepared[f'_{column}'] = (prepared[column] == True).to_numpy(dtype=bool)
+
+    return prepared
+
+
+def _mask(df: pd.DataFrame, mask_column: str, mask_function: Callable[[pd.DataFrame], pd.Series]) -> pd.Series:
+    if mask_column in df.columns:
+        return df[mask_column]
+    return mask_function(df)
+
+
+def pass_successful(df: pd.DataFrame) -> pd.Series:
+    """
+    Boolean mask of successful passes (pass_outcome == 'successful')
+    """
+    return _mask(df, PASS_SUCCESSFUL_COLUMN, _successful_pass_mask)
+
+
+def is_pass(df: pd.DataFrame) -> pd.Series:
+    """
+    Boolean mask of pass events (event_type == 'pass')
+    """
+    return _mask(df, IS_PASS_COLUMN, _pass_mask)
+
+
+def is_player_possession(df: pd.DataFrame) -> pd.Series:
+    """
+    Boolean mask of player possessions (event_type == 'player_possession')
+    """
+    return _mask(df, IS_PLAYER_POSSESSION_COLUMN, _player_possession_mask)
+
+
+def leads_to_shot(df: pd.DataFrame) -> pd.Series:
+    """
+    Boolean mask of events that led to a shot (lead_to_shot == True)
+    """
+    return _mask(df, LEAD_TO_SHOT_COLUMN, _lead_to_shot_mask)
+
+
+def masked_sum(series: pd.Series, mask: np.ndarray) -> float:
+    """
+    series[mask].sum() over a numeric column, without building the subset
+
+    Missing values count as zero, as in Series.sum().
+    """
+    return np.nansum(series.to_numpy(dtype=np.float64)[mask])
+
+
+def masked_mean(series: pd.Series, mask: np.ndarray) -> float:
+    """
+    series[mask].mean() over a numeric column, without building the subset
+
+    Missing values are skipped, as in Series.mean(); NaN if none remain.
+    """
+    values = series.to_numpy(dtype=np.float64)[mask]
+    count = np.count_nonzero(~np.isnan(values))
+    return np.nansum(values) / count if count else np.nan
+
+
+def is_true(df: pd.DataFrame, column: str) -> pd.Series:
+    """
+    Boolean mask of rows where a flag column is True (df[column] == True)
+
+    Uses the mask precomputed by prepare_events for FLAG_COLUMNS.
+    """
+    mask_column = f'_{column}'
+    if mask_column in df.columns:
+        return df[mask_column]
+    return df[column] == True
+
+
+def is_line_break(df: pd.DataFrame) -> np.ndarray:
+    """
+    Boolean array of line-breaking events (first_line_break | last_line_break)
+
+    Matches the object-dtype | on the raw columns: a missing
+    first_line_break gives False whatever last_line_break is, and a
+    missing last_line_break counts as False.
+    """
+    either = np.logical_or(is_true(df, 'first_line_break').to_numpy(), is_true(df, 'last_line_break').to_numpy())
+    return df['first_line_break'].notna().to_numpy() & either
+
+
+def value_counts(series: pd.Series, normalize: bool = False) -> pd.Series:
+    """
+    Series.value_counts that leaves out unobserved categories
+
+    Categorical columns are counted with a bincount over their codes;
+    categories with a zero count are dropped and ties keep first-appearance
+    order, so the result matches a plain column.
+    """
+    if not isinstance(series.dtype, pd.CategoricalDtype):
+        return series.value_counts(normalize=normalize)
+
+    codes = series.cat.codes.to_numpy()
+    codes = codes[codes >= 0]
+    counts = np.bincount(codes, minlength=len(series.cat.categories))
+    observed = pd.unique(codes)
+
+    result = pd.Series(counts[observed], index=series.cat.categories[observed])
+    if normalize:
+        result = result / result.sum()
+    return result.sort_values(ascending=False, kind='stable')
+
+
+def count_unique(series: pd.Series) -> int:
+    """
+    Series.nunique() from a single hash pass with pd.unique
+
+    Categorical columns are counted over their integer codes; missing
+    values are not counted.
+    """
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        uniques = pd.unique(series.cat.codes.to_numpy())
+        return int(np.count_nonzero(uniques >= 0))
+
+    uniques = pd.unique(series.to_numpy())
+    return int(len(uniques) - np.count_nonzero(pd.isna(uniques)))
+
+
+def equals_mask(series: pd.Series, value: str) -> np.ndarray:
+    """
+    Boolean array of entries in series equal to value
+
+    Categorical columns compare their integer codes against the value's
+    code instead of comparing strings.
+    """
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        categories = series.cat.categories
+        if value not in categories:
+            return np.zeros(len(series), dtype=bool)
+        return series.cat.codes.to_numpy() == categories.get_loc(value)
+
+    return (series == value).to_numpy(dtype=bool)
+
+
+def count_equal(series: pd.Series, value: str) -> int:
+    """
+    Number of entries in series equal to value (see equals_mask)
+    """
+    return int(np.count_nonzero(equals_mask(series, value)))
+
+
+def first_rows(df: pd.DataFrame, columns: List[str], key: str = 'player_id') -> pd.DataFrame:
+    """
+    Values of columns from the first row of each key, indexed by key
+
+    Equivalent to a per-key df[df[key] == k][column].iloc[0] lookup,
+    including keeping a missing first value (unlike groupby.first()).
+    """
+    first = df.loc[~df[key].duplicated(), [key] + columns]
+    return first.set_index(key)
@@ -7,16 +7,34 @@ import pandas as pd
 import numpy as np
 from typing import Dict, Any
 
+from .prepare import value_counts
 
-def analyze_set_piece_situations(events_df: pd.DataFrame) -> Dict[str, Any]:
+
+def select_set_piece_events(events_df: pd.DataFrame) -> pd.DataFrame:
     """
-    Analyze set-piece situations and outcomes
+    Events following a corner, free kick, throw-in or penalty
     """
-    # Filter set-piece events
-    set_pieces = events_df[
+    return events_df[
         events_df['game_interruption_before'].isin(['corner_kick', 'free_kick', 'throw_in', 'penalty'])
     ] if 'game_interruption_before' in events_df.columns else pd.DataFrame()
 
+
+def split_set_pieces(set_pieces: pd.DataFrame) -> Dict[str, pd.DataFrame]:
+    """
+    Set-piece events keyed by set-piece type, from one groupby pass
+    """
+    if len(set_pieces) == 0:
+        return {}
+    return dict(list(set_pieces.groupby('game_interruption_before', observed=True)))
+
+
+def analyze_set_piece_situations(set_pieces: pd.DataFrame) -> Dict[str, Any]:
+    """
+    Analyze set-piece situations and outcomes
+
+    Args:
+        set_pieces: Set-piece events (see select_set_piece_events)
+    """
     metrics = {}
 
     if len(set_pieces) > 0:
@@ -24,7 +42,7 @@ def analyze_set_piece_situations(events_df: pd.DataFrame) -> Dict[str, Any]:
 
         # By type
         if 'game_interruption_before' in set_pieces.columns:
-            set_piece_types = set_pieces['game_interruption_before'].value_counts().to_dict()
+            set_piece_types = value_counts(set_pieces['game_interruption_before']).to_dict()
             metrics['set_piece_types'] = set_piece_types
 
         # Success rate
@@ -36,20 +54,19 @@ def analyze_set_piece_situations(events_df: pd.DataFrame) -> Dict[str, Any]:
 
         # Delivery analysis
         if 'pass_range' in set_pieces.columns:
-            delivery_types = set_pieces['pass_range'].value_counts(normalize=True).to_dict()
+            delivery_types = value_counts(set_pieces['pass_range'], normalize=True).to_dict()
             metrics['delivery_types'] = delivery_types
 
     return metrics
 
 
-def analyze_corner_kicks(events_df: pd.DataFrame) -> Dict[str, Any]:
+def analyze_corner_kicks(corners: pd.DataFrame) -> Dict[str, Any]:
     """
     Detailed corner kick analysis
-    """
-    corners = events_df[
-        events_df['game_interruption_before'] == 'corner_kick'
-    ] if 'game_interruption_before' in events_df.columns else pd.DataFrame()
 
+    Args:
+        corners: Corner kick events (see split_set_pieces)
+    """
     metrics = {}
 
     if len(corners) > 0:
@@ -64,20 +81,19 @@ def analyze_corner_kicks(events_df: pd.DataFrame) -> Dict[str, Any]:
 
         # Delivery zones
         if 'channel_end' in corners.columns:
-            delivery_zones = corners['channel_end'].value_counts().to_dict()
+            delivery_zones = value_counts(corners['channel_end']).to_dict()
             metrics['corner_delivery_zones'] = delivery_zones
 
     return metrics
 
 
-def analyze_free_kicks(events_df: pd.DataFrame) -> Dict[str, Any]:
+def analyze_free_kicks(free_kicks: pd.DataFrame) -> Dict[str, Any]:
     """
     Detailed free kick analysis
-    """
-    free_kicks = events_df[
-        events_df['game_interruption_before'] == 'free_kick'
-    ] if 'game_interruption_before' in events_df.columns else pd.DataFrame()
 
+    Args:
+        free_kicks: Free kick events (see split_set_pieces)
+    """
     metrics = {}
 
     if len(free_kicks) > 0:
@@ -85,7 +101,7 @@ def analyze_free_kicks(events_df: pd.DataFrame) -> Dict[str, Any]:
 
         # Categorize by location
         if 'third_start' in free_kicks.columns:
-            location_dist = free_kicks['third_start'].value_counts().to_dict()
+            location_dist = value_counts(free_kicks['third_start']).to_dict()
             metrics['free_kick_locations'] = location_dist
 
         # Dangerous free kicks (attacking third)
@@ -115,16 +131,21 @@ def analyze_set_pieces(events_df: pd.DataFrame, phases_df: pd.DataFrame = None)
         'metrics': {}
     }
 
+    # Set-piece events are filtered once and split by type in one pass
+    set_pieces = select_set_piece_events(events_df)
+    set_pieces_by_type = split_set_pieces(set_pieces)
+    no_set_pieces = set_pieces.iloc[:0]
+
     # Overall set-piece analysis
-    set_piece_metrics = analyze_set_piece_situations(events_df)
+    set_piece_metrics = analyze_set_piece_situations(set_pieces)
     results['metrics']['overall'] = set_piece_metrics
 
     # Corner kicks
-    corner_metrics = analyze_corner_kicks(events_df)
+    corner_metrics = analyze_corner_kicks(set_pieces_by_type.get('corner_kick', no_set_pieces))
     results['metrics']['corners'] = corner_metrics
 
     # Free kicks
-    free_kick_metrics = analyze_free_kicks(events_df)
+    free_kick_metrics = analyze_free_kicks(set_pieces_by_type.get('free_kick', no_set_pieces))
     results['metrics']['free_kicks'] = free_kick_metrics
 
     return results
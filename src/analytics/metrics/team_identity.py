@@ -5,8 +5,15 @@ Analyzes formation, structure, and player roles
 
 import pandas as pd
 import numpy as np
+from scipy.special import xlogy
 from typing import Dict, Any
 
+from .prepare import first_rows, count_unique
+
+# Maximum entropies of the five channels and three thirds
+MAX_CHANNEL_ENTROPY = np.log(5)
+MAX_THIRD_ENTROPY = np.log(3)
+
 
 def analyze_formation_fluidity(events_df: pd.DataFrame) -> Dict[str, Any]:
     """
@@ -14,12 +21,15 @@ def analyze_formation_fluidity(events_df: pd.DataFrame) -> Dict[str, Any]:
     """
     metrics = {}
 
-    # Vertical compactness by phase
+    # Vertical compactness by phase (one grouped pass; phases without
+    # events have no group)
+    shape_by_phase = events_df.groupby('team_in_possession_phase_type', observed=True)[
+        ['team_in_possession_length_start', 'team_in_possession_width_start']
+    ].mean()
     for phase_type in ['build_up', 'create', 'finish']:
-        phase_data = events_df[events_df['team_in_possession_phase_type'] == phase_type]
-        if len(phase_data) > 0:
-            metrics[f'team_length_avg_{phase_type}'] = phase_data['team_in_possession_length_start'].mean()
-            metrics[f'team_width_avg_{phase_type}'] = phase_data['team_in_possession_width_start'].mean()
+        if phase_type in shape_by_phase.index:
+            metrics[f'team_length_avg_{phase_type}'] = shape_by_phase.at[phase_type, 'team_in_possession_length_start']
+            metrics[f'team_width_avg_{phase_type}'] = shape_by_phase.at[phase_type, 'team_in_possession_width_start']
 
     # Shape change rate
     if 'phase_index' in events_df.columns:
@@ -40,7 +50,7 @@ def analyze_channel_asymmetry(events_df: pd.DataFrame) -> Dict[str, Any]:
 
     # Count events by channel and player position
     if 'player_position' in events_df.columns and 'channel_start' in events_df.columns:
-        channel_usage = events_df.groupby(['player_position', 'channel_start']).size()
+        channel_usage = events_df.groupby(['player_position', 'channel_start'], observed=True).size()
 
         # For fullbacks specifically
         lb_channels = channel_usage.get('LB', pd.Series())
@@ -64,60 +74,83 @@ def analyze_channel_asymmetry(events_df: pd.DataFrame) -> Dict[str, Any]:
     return metrics
 
 
-def analyze_player_role_clarity(events_df: pd.DataFrame) -> pd.DataFrame:
+def _counts_by_player(events_df: pd.DataFrame, column: str, player_ids: pd.Index) -> pd.DataFrame:
     """
-    Measure how consistently players operate in defined spaces/roles
+    Event counts per player (rows, in player_ids order) and column value
     """
-    player_metrics = []
+    counts = events_df.groupby(['player_id', column], observed=True).size().unstack(fill_value=0)
+    return counts.reindex(player_ids, fill_value=0)
 
-    for player_id in events_df['player_id'].unique():
-        if pd.isna(player_id):
-            continue
-
-        player_data = events_df[events_df['player_id'] == player_id]
-
-        if len(player_data) == 0:
-            continue
-
-        # Spatial consistency
-        if 'channel_start' in player_data.columns:
-            channel_distribution = player_data['channel_start'].value_counts(normalize=True)
-            channel_entropy = -sum(p * np.log(p) for p in channel_distribution if p > 0) if len(channel_distribution) > 0 else 0
-        else:
-            channel_entropy = 0
 
-        if 'third_start' in player_data.columns:
-            third_distribution = player_data['third_start'].value_counts(normalize=True)
-            third_entropy = -sum(p * np.log(p) for p in third_distribution if p > 0) if len(third_distribution) > 0 else 0
-        else:
-            third_entropy = 0
-
-        # Phase involvement pattern
-        if 'team_in_possession_phase_type' in player_data.columns:
-            phase_involvement = player_data.groupby('team_in_possession_phase_type').size()
-            build_up_rate = phase_involvement.get('build_up', 0) / len(player_data)
-            create_rate = phase_involvement.get('create', 0) / len(player_data)
-            finish_rate = phase_involvement.get('finish', 0) / len(player_data)
-        else:
-            build_up_rate = create_rate = finish_rate = 0
+def _entropy_by_player(events_df: pd.DataFrame, column: str, player_ids: pd.Index) -> np.ndarray:
+    """
+    Entropy of each player's distribution over a column's values
 
-        # Get player info
-        player_name = player_data['player_name'].iloc[0] if 'player_name' in player_data.columns else f"Player {player_id}"
-        position = player_data['player_position'].iloc[0] if 'player_position' in player_data.columns else "Unknown"
+    Missing values are ignored; players without any value get 0.
+    """
+    counts = _counts_by_player(events_df, column, player_ids).to_numpy(dtype=np.float64)
+    totals = counts.sum(axis=1, keepdims=True)
+    p = np.divide(counts, totals, out=np.zeros_like(counts), where=totals > 0)
+    return -xlogy(p, p).sum(axis=1)
 
-        player_metrics.append({
-            'player_id': player_id,
-            'player_name': player_name,
-            'position': position,
-            'build_up_rate': build_up_rate,
-            'create_rate': create_rate,
-            'finish_rate': finish_rate,
-            'channel_consistency': 1 - (channel_entropy / np.log(5)) if channel_entropy > 0 else 1,
-            'third_consistency': 1 - (third_entropy / np.log(3)) if third_entropy > 0 else 1,
-            'total_actions': len(player_data)
-        })
 
-    return pd.DataFrame(player_metrics)
+def analyze_player_role_clarity(events_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Measure how consistently players operate in defined spaces/roles
+    """
+    # Players in order of first appearance; events without a player are dropped
+    total_actions = events_df.groupby('player_id', sort=False).size()
+
+    if total_actions.empty:
+        return pd.DataFrame()
+
+    player_ids = total_actions.index
+    n_players = len(player_ids)
+
+    # Spatial consistency
+    if 'channel_start' in events_df.columns:
+        channel_entropy = _entropy_by_player(events_df, 'channel_start', player_ids)
+    else:
+        channel_entropy = np.zeros(n_players)
+
+    if 'third_start' in events_df.columns:
+        third_entropy = _entropy_by_player(events_df, 'third_start', player_ids)
+    else:
+        third_entropy = np.zeros(n_players)
+
+    # Phase involvement pattern
+    if 'team_in_possession_phase_type' in events_df.columns:
+        phase_counts = _counts_by_player(events_df, 'team_in_possession_phase_type', player_ids)
+        phase_counts = phase_counts.reindex(columns=['build_up', 'create', 'finish'], fill_value=0)
+        phase_rates = phase_counts.to_numpy() / total_actions.to_numpy()[:, np.newaxis]
+        build_up_rate, create_rate, finish_rate = phase_rates.T
+    else:
+        build_up_rate = create_rate = finish_rate = 0
+
+    # Name and position come from each player's first event
+    first_events = first_rows(
+        events_df, [c for c in ('player_name', 'player_position') if c in events_df.columns]
+    )
+
+    return pd.DataFrame({
+        'player_id': player_ids,
+        'player_name': (
+            first_events['player_name'].reindex(player_ids).to_numpy()
+            if 'player_name' in events_df.columns
+            else [f"Player {player_id}" for player_id in player_ids]
+        ),
+        'position': (
+            first_events['player_position'].reindex(player_ids).to_numpy()
+            if 'player_position' in events_df.columns
+            else "Unknown"
+        ),
+        'build_up_rate': build_up_rate,
+        'create_rate': create_rate,
+        'finish_rate': finish_rate,
+        'channel_consistency': np.where(channel_entropy > 0, 1 - channel_entropy / MAX_CHANNEL_ENTROPY, 1),
+        'third_consistency': np.where(third_entropy > 0, 1 - third_entropy / MAX_THIRD_ENTROPY, 1),
+        'total_actions': total_actions.to_numpy(),
+    })
 
 
 def analyze_team_identity(events_df: pd.DataFrame, phases_df: pd.DataFrame = None) -> Dict[str, Any]:
@@ -146,9 +179,9 @@ def analyze_team_identity(events_df: pd.DataFrame, phases_df: pd.DataFrame = Non
 
     # Summary statistics
     results['metrics']['summary'] = {
-        'total_players': events_df['player_id'].nunique() if 'player_id' in events_df.columns else 0,
+        'total_players': count_unique(events_df['player_id']) if 'player_id' in events_df.columns else 0,
         'total_actions': len(events_df),
-        'unique_positions': events_df['player_position'].nunique() if 'player_position' in events_df.columns else 0
+        'unique_positions': count_unique(events_df['player_position']) if 'player_position' in events_df.columns else 0
     }
 
     return results
@@ -7,6 +7,8 @@ import pandas as pd
 import numpy as np
 from typing import Dict, Any, List
 
+from .prepare import pass_successful, equals_mask, is_true, is_line_break, masked_mean
+
 
 def identify_weakness_areas(events_df: pd.DataFrame) -> Dict[str, List[str]]:
     """
@@ -14,9 +16,12 @@ def identify_weakness_areas(events_df: pd.DataFrame) -> Dict[str, List[str]]:
     """
     weaknesses = []
 
-    # Analyze pass completion
-    if 'pass_outcome' in events_df.columns:
-        pass_accuracy = (events_df['pass_outcome'] == 'successful').mean()
+    # Successful-pass mask shared by the accuracy and pressure checks
+    successful = pass_successful(events_df).to_numpy() if 'pass_outcome' in events_df.columns else None
+
+    # Analyze pass completion (an empty match has no accuracy)
+    if successful is not None and successful.size > 0:
+        pass_accuracy = successful.mean()
         if pass_accuracy < 0.75:
             weaknesses.append({
                 'area': 'Passing Accuracy',
@@ -25,10 +30,10 @@ def identify_weakness_areas(events_df: pd.DataFrame) -> Dict[str, List[str]]:
             })
 
     # Analyze pressure handling
-    if 'xloss_player_possession_start' in events_df.columns and 'pass_outcome' in events_df.columns:
-        high_pressure = events_df[events_df['xloss_player_possession_start'] > 0.3]
-        if len(high_pressure) > 0:
-            pressure_success = (high_pressure['pass_outcome'] == 'successful').mean()
+    if 'xloss_player_possession_start' in events_df.columns and successful is not None:
+        high_pressure = (events_df['xloss_player_possession_start'] > 0.3).to_numpy()
+        if high_pressure.any():
+            pressure_success = successful[high_pressure].mean()
             if pressure_success < 0.65:
                 weaknesses.append({
                     'area': 'Pressure Resistance',
@@ -38,9 +43,9 @@ def identify_weakness_areas(events_df: pd.DataFrame) -> Dict[str, List[str]]:
 
     # Analyze final third effectiveness
     if 'third_start' in events_df.columns and 'lead_to_shot' in events_df.columns:
-        final_third = events_df[events_df['third_start'] == 'attacking_third']
-        if len(final_third) > 0:
-            final_third_efficiency = final_third['lead_to_shot'].mean()
+        final_third = equals_mask(events_df['third_start'], 'attacking_third')
+        if final_third.any():
+            final_third_efficiency = masked_mean(events_df['lead_to_shot'], final_third)
             if final_third_efficiency < 0.15:
                 weaknesses.append({
                     'area': 'Final Third Efficiency',
@@ -69,7 +74,7 @@ def identify_strength_areas(events_df: pd.DataFrame) -> Dict[str, List[str]]:
 
     # Line-breaking ability
     if 'first_line_break' in events_df.columns and 'last_line_break' in events_df.columns:
-        line_breaks = (events_df['first_line_break'] | events_df['last_line_break']).sum()
+        line_breaks = np.count_nonzero(is_line_break(events_df))
         total_actions = len(events_df)
         line_break_rate = line_breaks / total_actions if total_actions > 0 else 0
 
@@ -82,9 +87,9 @@ def identify_strength_areas(events_df: pd.DataFrame) -> Dict[str, List[str]]:
 
     # Build-up play
     if 'team_in_possession_phase_type' in events_df.columns:
-        buildup = events_df[events_df['team_in_possession_phase_type'] == 'build_up']
-        if len(buildup) > 0 and 'team_possession_loss_in_phase' in buildup.columns:
-            buildup_success = 1 - buildup['team_possession_loss_in_phase'].mean()
+        buildup = equals_mask(events_df['team_in_possession_phase_type'], 'build_up')
+        if buildup.any() and 'team_possession_loss_in_phase' in events_df.columns:
+            buildup_success = 1 - masked_mean(events_df['team_possession_loss_in_phase'], buildup)
             if buildup_success > 0.8:
                 strengths.append({
                     'area': 'Build-Up Play',
@@ -95,14 +100,18 @@ def identify_strength_areas(events_df: pd.DataFrame) -> Dict[str, List[str]]:
     return {'strengths': strengths}
 
 
-def suggest_training_priorities(events_df: pd.DataFrame) -> List[Dict[str, Any]]:
+def suggest_training_priorities(events_df: pd.DataFrame, weaknesses: List[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
     """
     Suggest prioritized training focus areas
+
+    weaknesses is the list from identify_weakness_areas; it is computed
+    here if not given.
     """
     priorities = []
 
     # Priority 1: Most critical weakness
-    weaknesses = identify_weakness_areas(events_df)['weaknesses']
+    if weaknesses is None:
+        weaknesses = identify_weakness_areas(events_df)['weaknesses']
     if weaknesses:
         # Sort by severity (lower value = higher priority)
         sorted_weaknesses = sorted(weaknesses, key=lambda x: x['value'])
@@ -116,24 +125,22 @@ def suggest_training_priorities(events_df: pd.DataFrame) -> List[Dict[str, Any]]
 
     # Priority 2: Player-specific development
     if 'player_id' in events_df.columns and 'pass_outcome' in events_df.columns:
-        player_pass_rates = events_df.groupby('player_id').apply(
-            lambda x: (x['pass_outcome'] == 'successful').mean()
-        )
+        player_pass_rates = pass_successful(events_df).groupby(events_df['player_id'], sort=False).mean()
         if len(player_pass_rates) > 0:
-            struggling_players = player_pass_rates[player_pass_rates < 0.7]
-            if len(struggling_players) > 0:
+            struggling_players = int(np.count_nonzero(player_pass_rates.to_numpy() < 0.7))
+            if struggling_players > 0:
                 priorities.append({
                     'priority': 2,
                     'focus': 'Individual Player Development',
-                    'reason': f"{len(struggling_players)} players below 70% pass accuracy",
+                    'reason': f"{struggling_players} players below 70% pass accuracy",
                     'action': 'Implement individual technical training programs'
                 })
 
     # Priority 3: Tactical awareness
     if 'n_passing_options_dangerous_not_difficult' in events_df.columns:
-        dangerous_available = events_df[events_df['n_passing_options_dangerous_not_difficult'] > 0]
-        if len(dangerous_available) > 0 and 'player_targeted_dangerous' in dangerous_available.columns:
-            utilization = (dangerous_available['player_targeted_dangerous'] == True).mean()
+        dangerous_available = (events_df['n_passing_options_dangerous_not_difficult'] > 0).to_numpy()
+        if dangerous_available.any() and 'player_targeted_dangerous' in events_df.columns:
+            utilization = is_true(events_df, 'player_targeted_dangerous').to_numpy()[dangerous_available].mean()
             if utilization < 0.6:
                 priorities.append({
                     'priority': 3,
@@ -170,7 +177,7 @@ def analyze_training_focus(events_df: pd.DataFrame, phases_df: pd.DataFrame = No
     results['metrics']['strengths'] = strength_metrics
 
     # Training priorities
-    priorities = suggest_training_priorities(events_df)
+    priorities = suggest_training_priorities(events_df, weakness_metrics['weaknesses'])
     results['metrics']['priorities'] = priorities
 
     return results
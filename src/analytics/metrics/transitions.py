@@ -7,36 +7,44 @@ import pandas as pd
 import numpy as np
 from typing import Dict, Any
 
+from .prepare import count_unique, value_counts, equals_mask, is_true, masked_mean, masked_sum
+
 
 def analyze_counter_attacks(events_df: pd.DataFrame) -> Dict[str, Any]:
     """
     Analyze counter-attacking patterns
     """
-    # Identify counter-attacks (quick transitions)
-    counter_attacks = events_df[
-        (events_df['current_team_in_possession_previous_phase_type'].isin(['regain', 'turnover'])) &
-        (events_df['team_in_possession_phase_type'] == 'direct')
-    ] if 'current_team_in_possession_previous_phase_type' in events_df.columns and 'team_in_possession_phase_type' in events_df.columns else pd.DataFrame()
-
     metrics = {}
 
-    if len(counter_attacks) > 0:
-        metrics['total_counter_attacks'] = counter_attacks['phase_index'].nunique() if 'phase_index' in counter_attacks.columns else len(counter_attacks)
+    if 'current_team_in_possession_previous_phase_type' not in events_df.columns or 'team_in_possession_phase_type' not in events_df.columns:
+        return metrics
+
+    # Identify counter-attacks (quick transitions); one mask shared by
+    # every reduction below instead of a filtered copy of the frame
+    previous_phase = events_df['current_team_in_possession_previous_phase_type']
+    counter_attacks = (
+        (equals_mask(previous_phase, 'regain') | equals_mask(previous_phase, 'turnover')) &
+        equals_mask(events_df['team_in_possession_phase_type'], 'direct')
+    )
+    n_counter_events = int(np.count_nonzero(counter_attacks))
+
+    if n_counter_events > 0:
+        metrics['total_counter_attacks'] = count_unique(events_df['phase_index'][counter_attacks]) if 'phase_index' in events_df.columns else n_counter_events
 
         # Speed metrics
-        if 'duration' in counter_attacks.columns:
-            metrics['avg_counter_duration'] = counter_attacks['duration'].mean()
+        if 'duration' in events_df.columns:
+            metrics['avg_counter_duration'] = masked_mean(events_df['duration'], counter_attacks)
 
         # Success metrics
-        if 'lead_to_shot' in counter_attacks.columns:
-            metrics['counter_to_shot_rate'] = counter_attacks['lead_to_shot'].mean()
+        if 'lead_to_shot' in events_df.columns:
+            metrics['counter_to_shot_rate'] = masked_mean(events_df['lead_to_shot'], counter_attacks)
 
-        if 'lead_to_goal' in counter_attacks.columns:
-            metrics['counter_to_goal_rate'] = counter_attacks['lead_to_goal'].mean()
+        if 'lead_to_goal' in events_df.columns:
+            metrics['counter_to_goal_rate'] = masked_mean(events_df['lead_to_goal'], counter_attacks)
 
         # Distance covered
-        if 'distance_covered' in counter_attacks.columns:
-            metrics['avg_counter_distance'] = counter_attacks['distance_covered'].sum() / metrics.get('total_counter_attacks', 1)
+        if 'distance_covered' in events_df.columns:
+            metrics['avg_counter_distance'] = masked_sum(events_df['distance_covered'], counter_attacks) / metrics.get('total_counter_attacks', 1)
 
     return metrics
 
@@ -45,27 +53,29 @@ def analyze_transition_speed(events_df: pd.DataFrame) -> Dict[str, Any]:
     """
     Analyze speed of transitions
     """
-    # Filter transition moments
-    transitions = events_df[
-        events_df['lead_to_different_phase'] == True
-    ] if 'lead_to_different_phase' in events_df.columns else pd.DataFrame()
-
     metrics = {}
 
-    if len(transitions) > 0:
-        metrics['total_transitions'] = len(transitions)
+    if 'lead_to_different_phase' not in events_df.columns:
+        return metrics
+
+    # Transition moments, counted once from the mask
+    transitions = is_true(events_df, 'lead_to_different_phase').to_numpy()
+    n_transitions = int(np.count_nonzero(transitions))
+
+    if n_transitions:
+        metrics['total_transitions'] = n_transitions
 
         # Duration analysis
-        if 'duration' in transitions.columns:
-            metrics['avg_transition_duration'] = transitions['duration'].mean()
+        if 'duration' in events_df.columns:
+            metrics['avg_transition_duration'] = masked_mean(events_df['duration'], transitions)
 
         # Forward momentum in transitions
-        if 'forward_momentum' in transitions.columns:
-            metrics['forward_momentum_rate'] = (transitions['forward_momentum'] == True).mean()
+        if 'forward_momentum' in events_df.columns:
+            metrics['forward_momentum_rate'] = is_true(events_df, 'forward_momentum').to_numpy()[transitions].mean()
 
         # Speed bands
-        if 'speed_avg_band' in transitions.columns:
-            speed_dist = transitions['speed_avg_band'].value_counts(normalize=True).to_dict()
+        if 'speed_avg_band' in events_df.columns:
+            speed_dist = value_counts(events_df['speed_avg_band'][transitions], normalize=True).to_dict()
             metrics['transition_speed_distribution'] = speed_dist
 
     return metrics
@@ -75,15 +85,16 @@ def analyze_defensive_transitions(events_df: pd.DataFrame) -> Dict[str, Any]:
     """
     Analyze defensive transition effectiveness
     """
-    # Quick defensive response after losing possession
-    defensive_transitions = events_df[
-        (events_df['team_possession_loss_in_phase'] == True)
-    ] if 'team_possession_loss_in_phase' in events_df.columns else pd.DataFrame()
-
     metrics = {}
 
-    if len(defensive_transitions) > 0:
-        metrics['total_defensive_transitions'] = len(defensive_transitions)
+    if 'team_possession_loss_in_phase' not in events_df.columns:
+        return metrics
+
+    # Quick defensive response after losing possession
+    n_defensive_transitions = int(np.count_nonzero(is_true(events_df, 'team_possession_loss_in_phase')))
+
+    if n_defensive_transitions:
+        metrics['total_defensive_transitions'] = n_defensive_transitions
 
         # Immediate pressure application
         if 'pressing_chain' in events_df.columns:
@@ -5,8 +5,37 @@ Creates enriched tracking data by merging tracking data with player metadata
 
 import pandas as pd
 import numpy as np
-import json
-from typing import Dict, Any, Optional
+import orjson
+import warnings
+from typing import Dict, Any, Optional, List, Iterator, Callable
+
+# Number of tracking frames parsed and normalized per batch
+TRACKING_BATCH_SIZE = 5000
+
+# Low-cardinality columns of the enriched frame stored as categoricals
+ENRICHED_CATEGORICAL_COLUMNS = [
+    "team_name",
+    "period",
+    "match_name",
+    "home_team.name",
+    "away_team.name",
+    "player_id",
+    "match_id",
+    "possession_group",
+    "start_time",
+    "end_time",
+    "date_time",
+    "short_name",
+    "player_role.position_group",
+    "player_role.name",
+    "player_role.acronym",
+    "direction_player_1st_half",
+    "direction_player_2nd_half",
+]
+
+# Pitch coordinate columns stored as float32 (sub-millimetre precision on
+# a 105 x 68 m pitch); id-like float columns keep float64
+ENRICHED_FLOAT32_COLUMNS = ["x", "y", "ball_x", "ball_y", "ball_z"]
 
 
 def time_to_seconds(time_str: Optional[str]) -> float:
@@ -25,23 +54,47 @@ def time_to_seconds(time_str: Optional[str]) -> float:
     return h * 3600 + m * 60 + s
 
 
-def process_tracking_data(tracking_file_path: str, match_id: str) -> pd.DataFrame:
+def iter_tracking_batches(
+    tracking_file_path: str,
+    batch_size: int = TRACKING_BATCH_SIZE
+) -> Iterator[List[Dict[str, Any]]]:
     """
-    Process tracking data from JSONL file
+    Stream frames from a tracking JSONL file in fixed-size batches
 
     Args:
         tracking_file_path: Path to tracking JSONL file
-        match_id: Match identifier
+        batch_size: Number of frames per batch
 
-    Returns:
-        Processed tracking dataframe
+    Yields:
+        Lists of parsed frame dictionaries
+    """
+    batch = []
+    with open(tracking_file_path, "rb") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            batch.append(orjson.loads(line))
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+
+    if batch:
+        yield batch
+
+
+def normalize_tracking_frames(frames: List[Dict[str, Any]]) -> pd.DataFrame:
     """
-    # Read tracking data (multi-line JSON file)
-    raw_data = pd.read_json(tracking_file_path, lines=True)
+    Flatten a batch of tracking frames to one row per player per frame
 
+    Args:
+        frames: Parsed tracking frame dictionaries
+
+    Returns:
+        Normalized tracking dataframe for the batch
+    """
     # Normalize JSON structure
     raw_df = pd.json_normalize(
-        raw_data.to_dict("records"),
+        frames,
         "player_data",
         ["frame", "timestamp", "period", "possession", "ball_data"],
     )
@@ -60,7 +113,124 @@ def process_tracking_data(tracking_file_path: str, match_id: str) -> pd.DataFram
     )
 
     # Drop the original 'possession' and 'ball_data' columns
-    raw_df = raw_df.drop(columns=["possession", "ball_data"])
+    return raw_df.drop(columns=["possession", "ball_data"])
+
+
+def align_batch_dtypes(batches: List[pd.DataFrame]) -> List[pd.DataFrame]:
+    """
+    Give all-missing batch columns the dtype the column has elsewhere
+
+    A column can be entirely missing within one batch (for example the
+    possession player before kick-off) and typed in the others. Casting
+    those batches first makes the concatenated dtype match a single parse
+    of the whole file: integers become float64 to hold the missing
+    values, booleans become object.
+
+    Args:
+        batches: Normalized tracking batches
+
+    Returns:
+        The batches, with all-missing columns cast where needed
+    """
+    all_missing = [
+        {column for column in batch.columns if batch[column].isna().all()}
+        for batch in batches
+    ]
+
+    target_dtypes = {}
+    for batch, missing in zip(batches, all_missing):
+        for column in batch.columns:
+            if column not in missing:
+                target_dtypes.setdefault(column, []).append(batch[column].dtype)
+
+    aligned = []
+    for batch, missing in zip(batches, all_missing):
+        casts = {}
+        for column in missing:
+            if column not in target_dtypes:
+                continue
+            dtype = np.result_type(*target_dtypes[column])
+            if dtype.kind in "iu":
+                dtype = np.dtype(np.float64)
+            elif dtype.kind == "b":
+                dtype = np.dtype(object)
+            if batch[column].dtype != dtype:
+                casts[column] = dtype
+        aligned.append(batch.astype(casts) if casts else batch)
+
+    return aligned
+
+
+def convert_timestamps(timestamps: pd.Series) -> pd.Series:
+    """
+    Parse frame timestamps to datetimes, as pd.read_json did
+
+    Args:
+        timestamps: Timestamp strings (missing before kick-off)
+
+    Returns:
+        datetime64 series, or the input unchanged if a value cannot be parsed
+    """
+    try:
+        with warnings.catch_warnings():
+            warnings.filterwarnings("ignore", "Could not infer format", UserWarning)
+            return pd.to_datetime(timestamps, errors="raise")
+    except (ValueError, OverflowError, TypeError):
+        return timestamps
+
+
+def float_if_missing(values: pd.Series) -> pd.Series:
+    """
+    Frame-level numbers as pd.read_json passed them to json_normalize
+
+    read_json reads an integer field with missing values (the period of
+    pre-kick-off frames) as float64, so the normalized column held floats
+    and NaN rather than ints and None.
+
+    Args:
+        values: Object column of a frame-level numeric field
+
+    Returns:
+        Object column of floats if any value is missing, else the input
+    """
+    if not values.isna().any():
+        return values
+    return values.astype(np.float64).astype(object)
+
+
+def process_tracking_data(
+    tracking_file_path: str,
+    match_id: str,
+    batch_callback: Optional[Callable[[int], None]] = None
+) -> pd.DataFrame:
+    """
+    Process tracking data from JSONL file
+
+    The file is parsed and normalized in batches of frames, so the raw
+    JSON for the whole match is never held in memory at once.
+
+    Args:
+        tracking_file_path: Path to tracking JSONL file
+        match_id: Match identifier
+        batch_callback: Called with the number of frames parsed so far
+            after each batch (optional)
+
+    Returns:
+        Processed tracking dataframe
+    """
+    batches = []
+    frames_parsed = 0
+    for frames in iter_tracking_batches(tracking_file_path):
+        batches.append(normalize_tracking_frames(frames))
+        frames_parsed += len(frames)
+        if batch_callback:
+            batch_callback(frames_parsed)
+
+    raw_df = pd.concat(align_batch_dtypes(batches), ignore_index=True)
+
+    # Match the column types of a single pd.read_json parse of the file
+    raw_df["timestamp"] = convert_timestamps(raw_df["timestamp"])
+    raw_df["period"] = float_if_missing(raw_df["period"])
 
     # Add the match_id identifier
     raw_df["match_id"] = match_id
@@ -68,6 +238,22 @@ def process_tracking_data(tracking_file_path: str, match_id: str) -> pd.DataFram
     return raw_df
 
 
+def load_csv_data(csv_file_path: str) -> pd.DataFrame:
+    """
+    Load an events or phases CSV file
+
+    Uses the multithreaded pyarrow parser; columns keep the default NumPy
+    dtypes so missing values behave exactly as with the C parser.
+
+    Args:
+        csv_file_path: Path to CSV file
+
+    Returns:
+        Loaded dataframe
+    """
+    return pd.read_csv(csv_file_path, engine="pyarrow")
+
+
 def process_metadata(metadata_file_path: str) -> pd.DataFrame:
     """
     Process metadata JSON file and extract player information
@@ -79,8 +265,8 @@ def process_metadata(metadata_file_path: str) -> pd.DataFrame:
         Processed players dataframe
     """
     # Reading metadata file
-    with open(metadata_file_path, "r") as f:
-        raw_match_data = json.load(f)
+    with open(metadata_file_path, "rb") as f:
+        raw_match_data = orjson.loads(f.read())
 
     # The output has nested json elements. We process them
     raw_match_df = pd.json_normalize(raw_match_data, max_level=2)
@@ -181,7 +367,8 @@ def process_metadata(metadata_file_path: str) -> pd.DataFrame:
 def create_enriched_tracking_data(
     tracking_file_path: str,
     metadata_file_path: str,
-    match_id: str
+    match_id: str,
+    progress_callback: Optional[Callable[[int, int, str], None]] = None
 ) -> pd.DataFrame:
     """
     Create enriched tracking data by merging tracking data with player metadata
@@ -190,24 +377,84 @@ def create_enriched_tracking_data(
         tracking_file_path: Path to tracking JSONL file
         metadata_file_path: Path to metadata JSON file
         match_id: Match identifier
+        progress_callback: Callback function for progress updates (current, total, message)
 
     Returns:
         Enriched tracking dataframe
     """
+    total_stages = 3
+
+    def report(stage: int, message: str):
+        if progress_callback:
+            progress_callback(stage, total_stages, message)
+
     # Process tracking data
-    tracking_df = process_tracking_data(tracking_file_path, match_id)
+    report(0, "Parsing tracking data...")
+    tracking_df = process_tracking_data(
+        tracking_file_path,
+        match_id,
+        batch_callback=lambda frames: report(0, f"Parsed {frames:,} tracking frames..."),
+    )
 
     # Process metadata
+    report(1, "Loading metadata...")
     players_df = process_metadata(metadata_file_path)
 
     # Merge tracking data with player metadata
+    report(2, "Merging tracking data with player metadata...")
     enriched_tracking_data = tracking_df.merge(
         players_df, left_on=["player_id"], right_on=["id"]
     )
 
+    # Store repeated strings/ids as integer-coded categoricals and
+    # coordinates as float32
+    enriched_tracking_data = categorize_columns(
+        enriched_tracking_data, ENRICHED_CATEGORICAL_COLUMNS
+    )
+    enriched_tracking_data = downcast_float_columns(
+        enriched_tracking_data, ENRICHED_FLOAT32_COLUMNS
+    )
+    report(3, "Tracking data enriched")
+
     return enriched_tracking_data
 
 
+def categorize_columns(df: pd.DataFrame, columns: List[str]) -> pd.DataFrame:
+    """
+    Convert repeated-value columns to pandas categorical dtype
+
+    Args:
+        df: Dataframe to convert (modified in place)
+        columns: Columns to convert; missing columns are skipped
+
+    Returns:
+        The same dataframe with categorical columns
+    """
+    for column in columns:
+        if column in df.columns:
+            df[column] = df[column].astype("category")
+
+    return df
+
+
+def downcast_float_columns(df: pd.DataFrame, columns: List[str]) -> pd.DataFrame:
+    """
+    Convert float64 columns to float32
+
+    Args:
+        df: Dataframe to convert (modified in place)
+        columns: Columns to convert; missing or non-float64 columns are skipped
+
+    Returns:
+        The same dataframe with float32 columns
+    """
+    for column in columns:
+        if column in df.columns and df[column].dtype == np.float64:
+            df[column] = df[column].astype(np.float32)
+
+    return df
+
+
 def get_enriched_data_info(enriched_df: pd.DataFrame) -> Dict[str, Any]:
     """
     Get information about the enriched tracking data
@@ -218,15 +465,29 @@ def get_enriched_data_info(enriched_df: pd.DataFrame) -> Dict[str, Any]:
     Returns:
         Dictionary with dataset information
     """
+    # Period categories are created sorted from the observed values, so the
+    # list can be read without scanning the column
+    if isinstance(enriched_df["period"].dtype, pd.CategoricalDtype):
+        periods = enriched_df["period"].cat.categories.tolist()
+    else:
+        periods = sorted(enriched_df["period"].unique().tolist())
+
+    # Match-level values are constant, so read them from the first row once
+    if len(enriched_df) > 0:
+        first_row = enriched_df[["match_id", "match_name"]].iloc[0]
+        match_id, match_name = first_row["match_id"], first_row["match_name"]
+    else:
+        match_id = match_name = None
+
     info = {
         "total_rows": len(enriched_df),
         "total_columns": len(enriched_df.columns),
         "column_names": enriched_df.columns.tolist(),
-        "match_id": enriched_df["match_id"].iloc[0] if len(enriched_df) > 0 else None,
-        "match_name": enriched_df["match_name"].iloc[0] if len(enriched_df) > 0 else None,
+        "match_id": match_id,
+        "match_name": match_name,
         "unique_players": enriched_df["player_id"].nunique(),
         "unique_frames": enriched_df["frame"].nunique(),
-        "periods": sorted(enriched_df["period"].unique().tolist()),
+        "periods": periods,
         "data_types": enriched_df.dtypes.to_dict(),
     }
 
@@ -5,10 +5,14 @@ Displays comprehensive match analysis with collapsible sections and interactive
 
 import streamlit as st
 import pandas as pd
+import json
 from typing import Dict, Any
 from .components import charts
 from ..analytics.colors import SKILLCORNER_COLORS
 
+# Encoded exports kept across all sessions (least recently used evicted)
+EXPORT_CACHE_MAX_ENTRIES = 4
+
 
 def render_executive_summary(metrics_results: Dict[str, Any], events_df: pd.DataFrame, phases_df: pd.DataFrame = None):
     """
@@ -241,6 +245,30 @@ def render_section_generic(section_data: Dict[str, Any]):
             st.write(value)
 
 
+def render_section(section_id: str, section_data: Dict[str, Any]):
+    """
+    Render the body of a single report section
+    """
+    status = section_data.get('status', 'unknown')
+
+    if status == 'error':
+        st.error(f"Error computing metrics: {section_data.get('error', 'Unknown error')}")
+        return
+
+    # Custom rendering for specific sections
+    if section_id == 'team_identity':
+        render_section_team_identity(section_data)
+    elif section_id == 'possession':
+        render_section_possession(section_data)
+    else:
+        # Generic rendering for other sections
+        render_section_generic(section_data)
+
+    # Show computation time
+    comp_time = section_data.get('computation_time', 0)
+    st.caption(f"⏱️ Computed in {comp_time:.2f}s")
+
+
 def render_match_report(metrics_results: Dict[str, Any], events_df: pd.DataFrame, phases_df: pd.DataFrame = None):
     """
     Render complete match analysis report
@@ -269,36 +297,39 @@ def render_match_report(metrics_results: Dict[str, Any], events_df: pd.DataFrame
 
     st.markdown("---")
 
-    # All 14 sections in collapsible expanders
+    # All 14 sections behind toggles; a section's charts and tables are
+    # only built while it is open, so reruns skip the collapsed ones
     sections = metrics_results.get('sections', {})
 
     for section_id, section_data in sections.items():
         icon = section_data.get('icon', '📌')
         name = section_data.get('name', section_id)
-        status = section_data.get('status', 'unknown')
 
-        # Render section in expander
-        with st.expander(f"{icon} {name}", expanded=False):
-            if status == 'error':
-                st.error(f"Error computing metrics: {section_data.get('error', 'Unknown error')}")
-            else:
-                # Custom rendering for specific sections
-                if section_id == 'team_identity':
-                    render_section_team_identity(section_data)
-                elif section_id == 'possession':
-                    render_section_possession(section_data)
-                else:
-                    # Generic rendering for other sections
-                    render_section_generic(section_data)
+        if not st.toggle(f"{icon} {name}", key=f"report_section_{section_id}"):
+            continue
+
+        with st.container(border=True):
+            render_section(section_id, section_data)
 
-                # Show computation time
-                comp_time = section_data.get('computation_time', 0)
-                st.caption(f"⏱️ Computed in {comp_time:.2f}s")
 
+@st.cache_data(show_spinner=False, max_entries=EXPORT_CACHE_MAX_ENTRIES)
+def _metrics_to_json(_metrics_results: Dict[str, Any], results_key: str) -> str:
+    """
+    Serialize metrics results to JSON once per computation
+
+    The results dict itself is not hashed (leading underscore); results_key
+    identifies the computation so reruns reuse the encoded string.
+    """
+    return json.dumps(_metrics_results, indent=2, default=str)
 
+
+@st.fragment
 def render_export_options(metrics_results: Dict[str, Any]):
     """
     Render export options for the report
+
+    Runs as a fragment so clicking an export button only reruns this
+    panel instead of re-rendering all report sections and charts.
     """
     st.markdown("---")
     st.subheader("💾 Export Options")
@@ -315,9 +346,9 @@ def render_export_options(metrics_results: Dict[str, Any]):
 
     with col3:
         # JSON export (implemented)
-        import json
-
-        json_data = json.dumps(metrics_results, indent=2, default=str)
+        summary = metrics_results.get('summary', {})
+        results_key = f"{metrics_results.get('team_id')}_{summary.get('computation_start')}"
+        json_data = _metrics_to_json(metrics_results, results_key)
         st.download_button(
             label="📊 Download JSON",
             data=json_data,
@@ -0,0 +1,46 @@
+"""
+Global CSS for the Streamlit app
+
+Built once at import time; app.py is re-executed on every rerun, so the
+stylesheet is kept here instead of being re-formatted on each run.
+"""
+
+from ..analytics.colors import SKILLCORNER_COLORS
+
+COLORS = SKILLCORNER_COLORS
+
+APP_CSS = f"""
+<style>
+    .main {{
+        background-color: {COLORS['background']};
+        color: {COLORS['text']};
+    }}
+    .stButton>button {{
+        background-color: {COLORS['primary']};
+        color: white;
+        border-radius: 5px;
+        padding: 0.5rem 1rem;
+        font-weight: 600;
+    }}
+    .stButton>button:hover {{
+        background-color: {COLORS['accent']};
+    }}
+    .success-box {{
+        background-color: {COLORS['success']};
+        color: white;
+        padding: 1rem;
+        border-radius: 5px;
+        margin: 1rem 0;
+    }}
+    .info-box {{
+        background-color: {COLORS['secondary']};
+        color: white;
+        padding: 1rem;
+        border-radius: 5px;
+        margin: 1rem 0;
+    }}
+    h1, h2, h3 {{
+        color: {COLORS['text']};
+    }}
+</style>
+"""
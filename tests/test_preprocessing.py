@@ -0,0 +1,100 @@
+"""
+Tests for the batched tracking data parser
+"""
+
+import json
+import os
+import tempfile
+import unittest
+import warnings
+from functools import partial
+from unittest import mock
+
+import pandas as pd
+
+from src.data_processing import preprocessing
+
+
+def _write_tracking_file(path: str, n_frames: int = 60, n_pre_kickoff: int = 25):
+    """Write a small tracking JSONL whose first frames precede kick-off"""
+    with open(path, "w") as f:
+        for frame in range(n_frames):
+            pre = frame < n_pre_kickoff
+            f.write(json.dumps({
+                "frame": frame,
+                "timestamp": None if pre else f"00:00:{frame % 60:02d}.{frame % 10}0",
+                "period": None if pre else 1,
+                "ball_data": {
+                    "x": None if pre else 1.5,
+                    "y": None if pre else -2.0,
+                    "z": None if pre else 0.1,
+                    "is_detected": None if pre else True,
+                },
+                "possession": {
+                    "player_id": None if pre else 100 + frame % 3,
+                    "group": None if pre else "home team",
+                },
+                "player_data": [
+                    {"x": float(i), "y": float(-i), "player_id": 100 + i, "is_detected": True}
+                    for i in range(3)
+                ],
+            }) + "\n")
+
+
+def _read_tracking_file_at_once(path: str, match_id: str) -> pd.DataFrame:
+    """Single-parse reference: the pd.read_json implementation the batches replaced"""
+    raw_data = pd.read_json(path, lines=True)
+    raw_df = pd.json_normalize(
+        raw_data.to_dict("records"),
+        "player_data",
+        ["frame", "timestamp", "period", "possession", "ball_data"],
+    )
+    raw_df["possession_player_id"] = raw_df["possession"].apply(
+        lambda x: x.get("player_id") if isinstance(x, dict) else None
+    )
+    raw_df["possession_group"] = raw_df["possession"].apply(
+        lambda x: x.get("group") if isinstance(x, dict) else None
+    )
+    raw_df[["ball_x", "ball_y", "ball_z", "is_detected_ball"]] = pd.json_normalize(
+        raw_df.ball_data
+    )
+    raw_df = raw_df.drop(columns=["possession", "ball_data"])
+    raw_df["match_id"] = match_id
+    return raw_df
+
+
+class ProcessTrackingDataTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "tracking.jsonl")
+        _write_tracking_file(self.path)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def _process_in_batches(self, batch_size: int) -> pd.DataFrame:
+        batches = partial(preprocessing.iter_tracking_batches, batch_size=batch_size)
+        with mock.patch.object(preprocessing, "iter_tracking_batches", batches):
+            with warnings.catch_warnings():
+                warnings.simplefilter("error", FutureWarning)
+                return preprocessing.process_tracking_data(self.path, "match")
+
+    def test_batched_parse_matches_single_parse(self):
+        expected = _read_tracking_file_at_once(self.path, "match")
+
+        # Batches of 20 frames: the first is entirely pre-kick-off
+        actual = self._process_in_batches(20)
+
+        pd.testing.assert_series_equal(actual.dtypes, expected.dtypes)
+        pd.testing.assert_frame_equal(actual, expected)
+
+    def test_timestamps_are_datetimes(self):
+        actual = self._process_in_batches(20)
+
+        self.assertTrue(pd.api.types.is_datetime64_any_dtype(actual["timestamp"]))
+        self.assertTrue(actual["timestamp"].isna().any())
+
+
+if __name__ == "__main__":
+    unittest.main()